@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Allocations made while processing a large document, with elements using
+plain parsers such as :class:`decimal.Decimal` as well as nested schema
+objects.
+
+Reports the number of validation contexts created, the time taken, the
+peak traced memory while processing, and the number of garbage
+collections which were triggered. The same document is also processed
+with policies which create a child context for every parser they try,
+as was done for all parsers before child contexts were limited to schema
+parsers, for comparison.
+"""
+
+import gc
+import time
+import warnings
+import tracemalloc
+from decimal import Decimal
+
+from tendril.validation.base import ValidationContext
+from tendril.validation.configs import ConfigOptionPolicy
+from tendril.validation.configs import ConfigKeyError
+from tendril.validation.configs import ConfigValueInvalidError
+from tendril.validation.configs import _parse
+from tendril.schema.base import NakedSchemaObject
+from tendril.schema.helpers import SchemaObjectList
+
+
+class Part(NakedSchemaObject):
+    _cache_policy_plan = True
+
+    def elements(self):
+        e = super(Part, self).elements()
+        e.update({
+            'name': self._p('ident'),
+            'qty': self._p('qty', parser=int),
+            'price': self._p(('pricing', 'unit'), parser=Decimal),
+            'tolerance': self._p(('pricing', 'tolerance'), parser=(int, float),
+                                 required=False, default=0),
+            'notes': self._p('notes', required=False),
+        })
+        return e
+
+    @property
+    def ident(self):
+        return self._raw_content['ident']
+
+
+class PartList(SchemaObjectList):
+    _objtype = Part
+
+
+class Document(NakedSchemaObject):
+    _cache_policy_plan = True
+
+    def elements(self):
+        e = super(Document, self).elements()
+        e.update({
+            'parts': self._p('parts', parser=PartList),
+        })
+        return e
+
+    @property
+    def ident(self):
+        return 'document'
+
+
+class EagerChildPolicy(ConfigOptionPolicy):
+    __slots__ = ()
+
+    def get(self, data, context=None):
+        pctx = context or self.context
+        path = self.path if isinstance(self.path, tuple) else (self.path,)
+        rval = data
+        try:
+            for key in path:
+                rval = rval[key]
+        except (KeyError, TypeError):
+            if self.required:
+                raise ConfigKeyError(policy=self)
+            return self._get_default(context)
+        if not self.parser:
+            return rval
+        parsers = self.parser if isinstance(self.parser, tuple) \
+            else (self.parser,)
+        for parser in parsers:
+            vctx = pctx.child(parser.__name__)
+            try:
+                return _parse(parser, rval, vctx, **self.parser_args)
+            except Exception:
+                continue
+        raise ConfigValueInvalidError(policy=self, value=rval)
+
+
+class EagerChildMixin(object):
+    def _p(self, *args, **kwargs):
+        return EagerChildPolicy(self._validation_context, *args, **kwargs)
+
+
+class EagerPart(EagerChildMixin, Part):
+    pass
+
+
+class EagerPartList(SchemaObjectList):
+    _objtype = EagerPart
+
+
+class EagerDocument(EagerChildMixin, NakedSchemaObject):
+    _cache_policy_plan = True
+
+    def elements(self):
+        e = super(EagerDocument, self).elements()
+        e.update({
+            'parts': self._p('parts', parser=EagerPartList),
+        })
+        return e
+
+    @property
+    def ident(self):
+        return 'document'
+
+
+def make_document(n):
+    return {'parts': [{
+        'ident': 'P{0}'.format(i),
+        'qty': str(i % 17),
+        'pricing': {'unit': '{0}.25'.format(i), 'tolerance': '0.5'},
+    } for i in range(n)]}
+
+
+class _ContextCounter(object):
+    def __init__(self):
+        self.count = 0
+        self._child = ValidationContext.child
+
+    def __enter__(self):
+        counter = self
+
+        def child(ctx, *args, **kwargs):
+            counter.count += 1
+            return counter._child(ctx, *args, **kwargs)
+        ValidationContext.child = child
+        return self
+
+    def __exit__(self, *args):
+        ValidationContext.child = self._child
+
+
+def _collections():
+    return sum(x['collections'] for x in gc.get_stats())
+
+
+def measure(n, cls=Document):
+    content = make_document(n)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        gc.collect()
+        with _ContextCounter() as counter:
+            collections = _collections()
+            start = time.perf_counter()
+            document = cls(content)
+            elapsed = time.perf_counter() - start
+            collections = _collections() - collections
+        assert len(document.parts) == n
+        del document
+        gc.collect()
+        tracemalloc.start()
+        cls(content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        'contexts': counter.count,
+        'time': elapsed,
+        'peak': peak,
+        'collections': collections,
+    }
+
+
+def main(n=20000):
+    eager = measure(n, EagerDocument)
+    result = measure(n)
+    print("Parts                     : {0}".format(n))
+    print("{0:25}   {1:>12}   {2:>12}".format('', 'eager child', 'current'))
+    print("{0:25} : {1:12d}   {2:12d}".format(
+        'Contexts created', eager['contexts'], result['contexts']))
+    print("{0:25} : {1:11.3f}s   {2:11.3f}s".format(
+        'Time', eager['time'], result['time']))
+    print("{0:25} : {1:8.1f} MiB   {2:8.1f} MiB".format(
+        'Peak traced memory', eager['peak'] / 2 ** 20,
+        result['peak'] / 2 ** 20))
+    print("{0:25} : {1:12d}   {2:12d}".format(
+        'Garbage collections', eager['collections'],
+        result['collections']))
+
+
+if __name__ == '__main__':
+    main()
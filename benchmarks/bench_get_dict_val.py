@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Per-lookup cost of :func:`tendril.validation.configs.get_dict_val` for
+policies with compiled accessors, and for policies which have not been
+compiled and build their accessor on first use, compared with the
+interpreting implementation it replaced, which is reproduced here for
+reference.
+
+The interpreting implementation is timed twice, once creating a child
+context for every parser as it used to, and once creating them only for
+schema parsers as the accessors do. The ratios are given against the
+second, so that they measure the accessors alone.
+"""
+
+import time
+from inspect import isclass
+
+from tendril.validation.base import ValidatableBase
+from tendril.validation.base import ValidationContext
+from tendril.validation.configs import ConfigOptionPolicy
+from tendril.validation.configs import ConfigKeyError
+from tendril.validation.configs import ConfigValueInvalidError
+from tendril.validation.configs import get_dict_val
+from tendril.validation.configs import _parse
+
+
+def legacy_get_dict_val(d, policy=None, child_contexts=True):
+    assert isinstance(d, dict)
+    if isinstance(policy.path, tuple):
+        try:
+            for key in policy.path:
+                if key not in d.keys():
+                    raise KeyError
+                d = d.get(key)
+        except (KeyError, AttributeError):
+            raise ConfigKeyError(policy=policy)
+        rval = d
+    else:
+        try:
+            if policy.path not in d.keys():
+                raise KeyError
+            rval = d.get(policy.path)
+        except KeyError:
+            raise ConfigKeyError(policy=policy)
+
+    if policy.parser:
+        try:
+            if isinstance(policy.parser, tuple):
+                for parser in policy.parser:
+                    try:
+                        vctx = _legacy_vctx(policy, parser, child_contexts)
+                        rval = _parse(parser, rval, vctx, **policy.parser_args)
+                        break
+                    except Exception:
+                        continue
+                else:
+                    raise Exception
+            else:
+                vctx = _legacy_vctx(policy, policy.parser, child_contexts)
+                rval = _parse(policy.parser, rval, vctx, **policy.parser_args)
+        except Exception:
+            raise ConfigValueInvalidError(policy=policy, value=rval)
+
+    if policy.check_option(rval):
+        return rval
+    else:
+        raise ConfigValueInvalidError(policy=policy, value=rval)
+
+
+def _legacy_vctx(policy, parser, child_contexts):
+    if child_contexts or \
+            isclass(parser) and issubclass(parser, ValidatableBase):
+        return policy.context.child(parser.__name__)
+    return None
+
+
+DATA = {
+    'name': 'widget',
+    'schema': {'name': 'Widget', 'version': '1.0'},
+    'geometry': {'size': {'width': '12', 'height': 4.5}},
+}
+
+CASES = [
+    ('string path', dict(path='name')),
+    ('tuple path', dict(path=('schema', 'name'))),
+    ('deep path, parser', dict(path=('geometry', 'size', 'width'),
+                               parser=int)),
+    ('parser chain', dict(path=('geometry', 'size', 'height'),
+                          parser=(int, float))),
+]
+
+
+def _best(func, repeat=15):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n=100000):
+    ctx = ValidationContext('bench', locality='bench')
+    for name, kwargs in CASES:
+        policy = ConfigOptionPolicy(ctx, **kwargs)
+        uncompiled_policy = ConfigOptionPolicy(ctx, **kwargs)
+        policy.compile()
+        assert get_dict_val(DATA, policy) == legacy_get_dict_val(DATA, policy)
+        assert get_dict_val(DATA, uncompiled_policy) == \
+            legacy_get_dict_val(DATA, policy)
+
+        def _legacy():
+            for _ in range(n):
+                legacy_get_dict_val(DATA, policy)
+
+        def _legacy_shared():
+            for _ in range(n):
+                legacy_get_dict_val(DATA, policy, child_contexts=False)
+
+        def _compiled():
+            for _ in range(n):
+                get_dict_val(DATA, policy)
+
+        def _uncompiled():
+            for _ in range(n):
+                get_dict_val(DATA, uncompiled_policy)
+
+        legacy = _best(_legacy) / n * 1e9
+        shared = _best(_legacy_shared) / n * 1e9
+        compiled = _best(_compiled) / n * 1e9
+        uncompiled = _best(_uncompiled) / n * 1e9
+        print("{0:20} legacy : {1:6.0f}ns  no child contexts : {2:6.0f}ns  "
+              "compiled : {3:6.0f}ns ({4:.2f}x)  "
+              "uncompiled : {5:6.0f}ns ({6:.2f}x)"
+              "".format(name, legacy, shared, compiled, shared / compiled,
+                        uncompiled, shared / uncompiled))
+
+
+if __name__ == '__main__':
+    main()
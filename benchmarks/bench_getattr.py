@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Repeated access to schema object attributes whose element could not be
+processed, and which are therefore resolved by
+:meth:`tendril.schema.base.SchemaProcessorBase.__getattr__`.
+
+The uncached cost is that of redoing the lookup on every access, using
+the implementation of ``__getattr__`` from before fallback lookups were
+cached, which is reproduced here for reference.
+"""
+
+import time
+import warnings
+
+from tendril.schema.base import NakedSchemaObject
+
+
+class BenchObject(NakedSchemaObject):
+    _cache_policy_plan = True
+
+    def elements(self):
+        e = super(BenchObject, self).elements()
+        e.update({
+            'count': self._p(('values', 'count'), parser=int),
+            'missing': self._p(('values', 'missing'), required=True),
+        })
+        return e
+
+    @property
+    def ident(self):
+        return 'bench'
+
+
+class UncachedBenchObject(BenchObject):
+    def __getattr__(self, item):
+        policies = self.__dict__.get('_policies', None)
+        if policies is None or item not in policies.keys():
+            raise AttributeError("%r has no attribute %r" % (type(self), item))
+        policy = self._policies[item]
+        return policy.get(self._raw)
+
+
+def _best(func, repeat=15):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _access(obj, key, n):
+    for _ in range(n):
+        try:
+            getattr(obj, key)
+        except Exception:
+            pass
+
+
+def main(n=20000):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        content = {'values': {'count': 'not a number'}}
+        obj = BenchObject(content)
+        uncached_obj = UncachedBenchObject(content)
+    for key in ('count', 'missing'):
+        uncached = _best(lambda: _access(uncached_obj, key, n))
+        cached = _best(lambda: _access(obj, key, n))
+        print("{0:10} uncached : {1:.6f}s  cached : {2:.6f}s  ({3:.1f}x)"
+              "".format(key, uncached, cached, uncached / cached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Lookups by handle in a :class:`tendril.schema.helpers.SchemaObjectList`
+of 100000 items, using the handle index, compared with the linear scan
+it replaced.
+"""
+
+import time
+import random
+
+from tendril.validation.base import ValidatableBase
+from tendril.schema.helpers import SchemaObjectList
+
+
+class Item(ValidatableBase):
+    handle = 'name'
+
+    def __init__(self, content, vctx=None):
+        super(Item, self).__init__(vctx=vctx)
+        self.name = content
+
+    def _validate(self):
+        self._validated = True
+
+
+class ItemList(SchemaObjectList):
+    _objtype = Item
+
+
+def linear_get(lst, item):
+    for candidate in lst.content:
+        if getattr(candidate, lst._objtype.handle) == item:
+            return candidate
+    raise ValueError(item)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(n=100000, lookups=1000):
+    lst = ItemList(['item{0}'.format(i) for i in range(n)])
+    keys = ['item{0}'.format(random.randrange(n)) for _ in range(lookups)]
+
+    linear = _timed(lambda: [linear_get(lst, k) for k in keys])
+    build = _timed(lambda: lst.get(keys[0]))
+    indexed = _timed(lambda: [lst.get(k) for k in keys])
+    assert all(lst.get(k) is linear_get(lst, k) for k in keys[:10])
+    handles = _timed(lambda: [len(lst.handles) for _ in range(lookups)])
+    contains = _timed(lambda: [k in lst.handles for k in keys])
+    updates = _timed(lambda: [lst.insert(0, Item(k)) or lst.pop()
+                              for k in keys])
+
+    print("Items                     : {0}".format(n))
+    print("Lookups                   : {0}".format(lookups))
+    print("Linear scan               : {0:.6f}s".format(linear))
+    print("Index build               : {0:.6f}s".format(build))
+    print("Indexed                   : {0:.6f}s".format(indexed))
+    print("Handles view              : {0:.6f}s".format(handles))
+    print("Handle membership         : {0:.6f}s".format(contains))
+    print("Insert and pop            : {0:.6f}s".format(updates))
+
+
+if __name__ == '__main__':
+    main()
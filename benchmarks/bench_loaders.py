@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Time taken to read a representative schema controlled document with each
+of the document loader backends of :mod:`tendril.schema.loaders`, i.e.,
+the pure python and libyaml based YAML loaders, and the JSON loader.
+
+Before timing them, the backends are checked to produce equivalent
+documents, down to the types of the numbers and dates they contain. All
+the backends read the JSON file, since JSON is also valid YAML. Only the
+YAML backends read the YAML file.
+"""
+
+import os
+import json
+import time
+import shutil
+import datetime
+import tempfile
+
+import yaml
+
+from tendril.schema.loaders import FastYamlLoader
+from tendril.schema.loaders import YamlDocumentLoader
+from tendril.schema.loaders import json_loader
+
+
+def make_document(n, dates=True):
+    def _date(i):
+        value = datetime.date(2019, 1 + i % 12, 1 + i % 28)
+        return value if dates else value.isoformat()
+    return {
+        'schema': {'name': 'PartsList', 'version': 1.0},
+        'title': 'Representative parts list',
+        'released': _date(0),
+        'parts': [{
+            'ident': 'P{0}'.format(i),
+            'qty': i % 17,
+            'obsolete': i % 5 == 0,
+            'notes': None if i % 3 else 'Note {0}'.format(i),
+            'pricing': {'unit': i + 0.25, 'currency': 'INR',
+                        'tolerance': -(i % 7)},
+            'updated': _date(i),
+            'tags': ['t{0}'.format(i % 4), 'smd'],
+        } for i in range(n)],
+    }
+
+
+def typed(tree):
+    if isinstance(tree, dict):
+        return {k: typed(v) for k, v in tree.items()}
+    if isinstance(tree, list):
+        return [typed(x) for x in tree]
+    return type(tree), tree
+
+
+def backends():
+    rval = [('yaml (python)', YamlDocumentLoader(yaml.Loader))]
+    if FastYamlLoader is not yaml.Loader:
+        rval.append(('yaml (libyaml)', YamlDocumentLoader(FastYamlLoader)))
+    return rval
+
+
+def check(path, loaders):
+    results = [(name, typed(loader(path))) for name, loader in loaders]
+    reference_name, reference = results[0]
+    for name, result in results[1:]:
+        if result != reference:
+            raise AssertionError(
+                "{0} and {1} differ on {2}"
+                "".format(reference_name, name, os.path.basename(path))
+            )
+
+
+def measure(loader, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n=2000, repeat=5):
+    workdir = tempfile.mkdtemp()
+    try:
+        yaml_path = os.path.join(workdir, 'parts.yaml')
+        with open(yaml_path, 'w') as f:
+            yaml.dump(make_document(n), f, default_flow_style=False)
+        json_path = os.path.join(workdir, 'parts.json')
+        with open(json_path, 'w') as f:
+            json.dump(make_document(n, dates=False), f, indent=1)
+
+        yaml_backends = backends()
+        all_backends = yaml_backends + [('json', json_loader)]
+        check(yaml_path, yaml_backends)
+        check(json_path, all_backends)
+        print("Parts                     : {0}".format(n))
+        print("Equivalent                : yes")
+        for path, loaders in ((yaml_path, yaml_backends),
+                              (json_path, all_backends)):
+            print("{0} ({1:.0f} KiB)".format(os.path.basename(path),
+                                           os.path.getsize(path) / 1024))
+            for name, loader in loaders:
+                print("  {0:23} : {1:.4f}s"
+                      "".format(name, measure(loader, path, repeat)))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
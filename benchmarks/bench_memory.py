@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Memory used by each policy and validation error object, measured with
+:mod:`tracemalloc` over many instances. Only the memory of the objects
+themselves is counted, and not that of the values they refer to, which
+are shared by all instances.
+"""
+
+import tracemalloc
+from decimal import Decimal
+
+from tendril.validation.base import ValidationContext
+from tendril.validation.configs import ConfigOptionPolicy
+from tendril.validation.configs import ConfigKeyError
+from tendril.validation.configs import ConfigValueInvalidError
+from tendril.validation.schema import SchemaPolicy
+from tendril.validation.schema import SchemaNotSupportedError
+
+
+def per_object(factory, n):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [factory() for _ in range(n)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    holder = n * 8
+    del objects
+    return (after - before - holder) / n
+
+
+def main(n=100000):
+    ctx = ValidationContext('bench', locality='bench')
+    path = ('parts', 'value')
+    policy = ConfigOptionPolicy(ctx, path, parser=Decimal)
+    spolicy = SchemaPolicy(ctx, 'Bench', Decimal('1.0'), Decimal('1.0'))
+    version = Decimal('2.0')
+    cases = [
+        ('ConfigOptionPolicy',
+         lambda: ConfigOptionPolicy(ctx, path, parser=Decimal)),
+        ('ConfigOptionPolicy.bind', lambda: policy.bind(ctx)),
+        ('SchemaPolicy',
+         lambda: SchemaPolicy(ctx, 'Bench', version, version)),
+        ('ConfigKeyError', lambda: ConfigKeyError(policy=policy)),
+        ('ConfigValueInvalidError',
+         lambda: ConfigValueInvalidError(policy=policy, value=path)),
+        ('SchemaNotSupportedError',
+         lambda: SchemaNotSupportedError(spolicy, version)),
+    ]
+    for name, factory in cases:
+        print("{0:26} : {1:6.1f} bytes".format(name, per_object(factory, n)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Load time and memory of a long list of numbers, held in a
+:class:`tendril.schema.helpers.SchemaObjectList` and in a
+:class:`tendril.schema.helpers.ScalarList`.
+"""
+
+import time
+import tracemalloc
+
+from tendril.schema.helpers import SchemaObjectList
+from tendril.schema.helpers import ScalarList
+from tendril.schema.helpers import numpy
+
+
+class FloatList(SchemaObjectList):
+    _objtype = float
+
+
+class CompactFloatList(ScalarList):
+    _use_numpy = False
+
+
+class NumpyFloatList(ScalarList):
+    _use_numpy = True
+
+
+def measure(cls, content):
+    start = time.perf_counter()
+    cls(content)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    lst = cls(content)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(lst) == len(content)
+    return elapsed, current
+
+
+def main(n=1000000):
+    content = ['{0}.5'.format(i) for i in range(1, n + 1)]
+    classes = [FloatList, CompactFloatList]
+    if numpy is not None:
+        classes.append(NumpyFloatList)
+    print("Items                     : {0}".format(n))
+    for cls in classes:
+        elapsed, memory = measure(cls, content)
+        print("{0:25} : {1:.3f}s  {2:6.1f} MiB"
+              "".format(cls.__name__, elapsed, memory / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
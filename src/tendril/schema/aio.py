@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Asyncio Loading Interface (:mod:`tendril.schema.aio`)
+=====================================================
+
+Loads schema controlled files from asyncio code without blocking the
+event loop. The actual loading, including reading and parsing the file
+and any filesystem checks made during validation, runs on an executor.
+
+The number of loads running at any time is bounded by the
+``concurrency`` of the :class:`AsyncSchemaLoader`. Concurrent requests
+for the same path are coalesced into a single load, and all callers get
+the same processed object. A caller which is cancelled stops waiting
+for the load. The load itself is cancelled only once all the callers
+waiting for it have been cancelled, and only if it has not yet started
+running on the executor.
+
+"""
+
+import os
+import asyncio
+import weakref
+
+from tendril.schema.batch import LoadResult
+
+
+class _InflightLoad(object):
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSchemaLoader(object):
+    def __init__(self, manager, concurrency=8, executor=None):
+        self._manager = manager
+        self._concurrency = concurrency
+        self._executor = executor
+        self._loop_state = weakref.WeakKeyDictionary()
+
+    def _state(self, loop):
+        try:
+            return self._loop_state[loop]
+        except KeyError:
+            state = (asyncio.Semaphore(self._concurrency), {})
+            self._loop_state[loop] = state
+            return state
+
+    async def _load(self, loop, semaphore, path):
+        async with semaphore:
+            return await loop.run_in_executor(
+                self._executor, self._manager.load, path
+            )
+
+    async def load(self, path):
+        loop = asyncio.get_event_loop()
+        semaphore, inflight = self._state(loop)
+        key = os.path.abspath(path)
+        entry = inflight.get(key, None)
+        if entry is None:
+            task = asyncio.ensure_future(self._load(loop, semaphore, path))
+            entry = _InflightLoad(task)
+            inflight[key] = entry
+
+            def _done(_, key=key, entry=entry):
+                if inflight.get(key, None) is entry:
+                    del inflight[key]
+            task.add_done_callback(_done)
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.waiters == 1 and not entry.task.done():
+                entry.task.cancel()
+            raise
+        finally:
+            entry.waiters -= 1
+
+    async def _load_result(self, path):
+        # Errors loading one file are returned in its result, and do not
+        # affect the loads of the other files.
+        try:
+            value = await self.load(path)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return LoadResult(path, error=e)
+        return LoadResult.from_value(path, value)
+
+    async def load_many(self, paths):
+        """
+        Asynchronously iterate over a :class:`tendril.schema.batch.LoadResult`
+        for each of the given paths, in the order in which the loads
+        complete. Loads which are still pending when the iteration is
+        abandoned are cancelled.
+        """
+        tasks = [asyncio.ensure_future(self._load_result(path))
+                 for path in paths]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+def load(manager):
+    pass
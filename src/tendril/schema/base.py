@@ -26,8 +26,12 @@ import os
 import warnings
 from six import iteritems
 from decimal import Decimal
+from collections.abc import MutableMapping
 from jinja2 import Template
-from tendril.utils.files import yml as yaml
+from tendril.schema.cache import document_cache
+from tendril.schema.loaders import document_loaders
+from tendril.schema.sink import current_sink
+from tendril.schema.sink import nesting
 
 from tendril.validation.base import ValidatableBase
 from tendril.validation.base import ValidationContext
@@ -35,12 +39,172 @@ from tendril.validation.schema import SchemaPolicy
 from tendril.validation.schema import SchemaNotSupportedError
 from tendril.validation.configs import ConfigOptionPolicy
 from tendril.validation.configs import ContextualConfigError
+from tendril.validation.configs import CompactStateMixin
 
 from tendril.utils import log
 logger = log.get_logger(__name__, log.DEFAULT)
 
 
+class SchemaPolicyPlan(object):
+    """
+    Compiled, immutable set of the schema policies of a schema class.
+
+    The plan is built from the policies returned by ``schema_policies()``
+    for the first instance of a class, and is shared by all subsequent
+    instances of that class. Each instance binds only its own validation
+    context to the plan, using :meth:`bind`.
+
+    Plans are only used for classes which declare that their policies do
+    not depend on the state of the instance, by setting
+    ``_cache_policy_plan = True``. Policies using values derived from the
+    instance, such as parser arguments computed from its path, cannot be
+    detected reliably, and would otherwise be silently shared.
+
+    Policies are considered part of the plan's immutable state once the
+    plan is compiled, and should not be modified thereafter.
+    """
+    def __init__(self, policies):
+        self._policies = dict(policies)
+        self._keys = tuple(policies.keys())
+        for policy in self._policies.values():
+            if hasattr(policy, 'compile'):
+                policy.compile()
+
+    @staticmethod
+    def _references(value, instance):
+        if value is instance:
+            return True
+        if getattr(value, '__self__', None) is instance:
+            return True
+        if isinstance(value, (tuple, list)):
+            return any(SchemaPolicyPlan._references(x, instance)
+                       for x in value)
+        if isinstance(value, dict):
+            return any(SchemaPolicyPlan._references(x, instance)
+                       for x in value.values())
+        return False
+
+    @classmethod
+    def compile(cls, instance, policies):
+        """
+        Compile the given policies into a plan, returning ``None`` if the
+        policies hold references to the instance they were created by
+        (such as bound methods used as parsers), or if they cannot be
+        bound to other contexts, in which case they cannot be shared
+        across instances.
+        """
+        for policy in policies.values():
+            if not hasattr(policy, 'bind'):
+                return None
+            if isinstance(policy, CompactStateMixin):
+                state = policy._get_state()
+            else:
+                state = getattr(policy, '__dict__', {})
+            for k, v in iteritems(state):
+                if k == 'context':
+                    continue
+                if cls._references(v, instance):
+                    return None
+        return cls(policies)
+
+    def keys(self):
+        return self._keys
+
+    def __contains__(self, item):
+        return item in self._policies
+
+    def __getitem__(self, item):
+        return self._policies[item]
+
+    def bind(self, vctx):
+        return BoundSchemaPolicies(self, vctx)
+
+
+class BoundSchemaPolicies(MutableMapping):
+    """
+    Policies of a :class:`SchemaPolicyPlan`, bound to the validation
+    context of a single instance. Policies are bound lazily on first
+    access. Policies set on the mapping override those of the plan
+    for this instance alone.
+    """
+    def __init__(self, plan, vctx):
+        self._plan = plan
+        self._vctx = vctx
+        self._bound = {}
+        self._removed = None
+
+    def __getitem__(self, key):
+        try:
+            return self._bound[key]
+        except KeyError:
+            pass
+        if self._removed and key in self._removed:
+            raise KeyError(key)
+        policy = self._plan[key].bind(self._vctx)
+        self._bound[key] = policy
+        return policy
+
+    def __setitem__(self, key, value):
+        if self._removed:
+            self._removed.discard(key)
+        self._bound[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._bound.pop(key, None)
+        if key in self._plan:
+            if self._removed is None:
+                self._removed = set()
+            self._removed.add(key)
+
+    def __contains__(self, key):
+        if key in self._bound:
+            return True
+        if self._removed and key in self._removed:
+            return False
+        return key in self._plan
+
+    def __iter__(self):
+        for key in self._plan.keys():
+            if self._removed and key in self._removed:
+                continue
+            yield key
+        for key in self._bound.keys():
+            if key not in self._plan:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def iter_unbound(self):
+        """
+        Iterate over ``(key, policy, vctx)`` for all the policies, without
+        binding the policies of the plan. Policies which are yielded
+        alongside a ``vctx`` are shared with other instances, and should
+        be evaluated against the provided context.
+        """
+        for key in self._plan.keys():
+            if key in self._bound:
+                yield key, self._bound[key], None
+            elif not self._removed or key not in self._removed:
+                yield key, self._plan[key], self._vctx
+        for key, policy in iteritems(self._bound):
+            if key not in self._plan:
+                yield key, policy, None
+
+
 class SchemaProcessorBase(ValidatableBase):
+    # Set to True in subclasses whose policies do not depend on the state
+    # of the instance, to have them compiled once and shared by all the
+    # instances of the class. See SchemaPolicyPlan. Subclasses overriding
+    # elements() or schema_policies() do not inherit this, and have to set
+    # it again themselves.
+    _cache_policy_plan = False
+    _policy_plan = None
+    # Keys of the elements yet to be processed, in lazy mode.
+    _pending = None
+
     def __init__(self, *args, **kwargs):
         super(SchemaProcessorBase, self).__init__(*args, **kwargs)
         self._policies = {}
@@ -60,13 +224,39 @@ class SchemaProcessorBase(ValidatableBase):
         policies = self.elements()
         return policies
 
+    @classmethod
+    def _shares_policy_plan(cls):
+        for base in cls.__mro__:
+            if '_cache_policy_plan' in base.__dict__:
+                break
+        if not base.__dict__['_cache_policy_plan']:
+            return False
+        return all(getattr(cls, x) is getattr(base, x)
+                   for x in ('elements', 'schema_policies'))
+
     def _load_schema_policies(self):
-        self._policies.update(self.schema_policies())
+        cls = self.__class__
+        plan = cls.__dict__.get('_policy_plan', None)
+        if plan is None:
+            if not cls._shares_policy_plan():
+                cls._policy_plan = False
+                self._policies.update(self.schema_policies())
+                return
+            policies = self.schema_policies()
+            plan = SchemaPolicyPlan.compile(self, policies)
+            cls._policy_plan = plan or False
+            if not plan:
+                self._policies.update(policies)
+                return
+        if not plan:
+            self._policies.update(self.schema_policies())
+            return
+        self._policies = plan.bind(self._validation_context)
 
-    def _process_element(self, key, policy):
+    def _process_element(self, key, policy, vctx=None):
         if isinstance(policy, ConfigOptionPolicy):
             try:
-                value = policy.get(self._raw)
+                value = policy.get(self._raw, vctx)
                 if isinstance(value, ValidatableBase):
                     value.validate()
                     self._validation_errors.add(value.validation_errors)
@@ -80,42 +270,187 @@ class SchemaProcessorBase(ValidatableBase):
                 #  A better way to communicate such errors is required.
                 self._validation_errors.add(e)
 
+    def _iter_policies(self):
+        policies = self._policies
+        if isinstance(policies, BoundSchemaPolicies) and \
+                self._process_element.__func__ is \
+                SchemaProcessorBase._process_element:
+            return policies.iter_unbound()
+        return ((k, v, None) for k, v in iteritems(policies))
+
     def _process(self):
-        for key, policy in iteritems(self._policies):
-            self._process_element(key, policy)
+        for key, policy, vctx in self._iter_policies():
+            if vctx is None:
+                self._process_element(key, policy)
+            else:
+                self._process_element(key, policy, vctx)
 
     def __getattr__(self, item):
-        if item not in self._policies.keys():
+        # _policies is looked up in __dict__ directly, since it may not yet
+        # exist when the instance is being restored by pickle or copy.
+        policies = self.__dict__.get('_policies', None)
+        if policies is None or item not in policies.keys():
             raise AttributeError("%r has no attribute %r" % (type(self), item))
-        policy = self._policies[item]
-        return policy.get(self._raw)
+        if self._pending and item in self._pending:
+            self._pending.discard(item)
+            # The errors of the element are reported along with those of
+            # this object, when it is materialized, and not by any nested
+            # object built here.
+            with nesting():
+                self._process_element(item, policies[item])
+            if item in self.__dict__:
+                return self.__dict__[item]
+        # Values and errors of fallback lookups are cached, since these are
+        # otherwise redone on every access. The cache is tied to the raw
+        # content it was filled from, and is discarded if that is replaced.
+        # Use _invalidate_lookups() if the raw content is modified in place.
+        raw = self._raw
+        cache = self.__dict__.get('_lookup_cache', None)
+        if cache is None or cache[0] is not raw:
+            cache = self._lookup_cache = (raw, {})
+        try:
+            value, error = cache[1][item]
+        except KeyError:
+            try:
+                value, error = self._policies[item].get(raw), None
+            except Exception as e:
+                value, error = None, e
+            cache[1][item] = (value, error)
+        if error is not None:
+            raise error.with_traceback(None)
+        return value
+
+    def _invalidate_lookups(self):
+        self.__dict__.pop('_lookup_cache', None)
+
+    def __getstate__(self):
+        # The policies are not part of the state of the object, and are
+        # bound again when it is restored. Cached lookups are dropped.
+        state = dict(self.__dict__)
+        state.pop('_policies', None)
+        state.pop('_lookup_cache', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._policies = {}
+        self._load_schema_policies()
 
     def _validate(self):
         self._validated = True
 
 
 class NakedSchemaObject(SchemaProcessorBase):
-    def __init__(self, content, *args, **kwargs):
+    """
+    Schema object processing the given raw content.
+
+    All elements are processed when the object is created, unless the
+    object is created in lazy mode, either by passing ``lazy=True`` or by
+    setting ``_lazy = True`` on the class. In lazy mode, each element is
+    processed only when the corresponding attribute is first accessed.
+    Validation errors therefore accumulate as elements are accessed.
+    :meth:`materialize`, as well as :meth:`validate` and
+    :attr:`validation_errors`, process any remaining elements and provide
+    the full set of validation errors.
+    """
+    _lazy = False
+
+    def __init__(self, content, *args, lazy=None, **kwargs):
         super(NakedSchemaObject, self).__init__(*args, **kwargs)
         self._raw_content = content
-        self._process()
+        if lazy is not None:
+            self._lazy = lazy
+        if self._lazy:
+            self._pending = set(self._policies.keys())
+            self._process_lazy()
+        else:
+            self._process_and_report(self._process)
+
+    def _process_lazy(self):
+        pass
+
+    def _process_and_report(self, process):
+        # In batch mode, the errors of the outermost object, which include
+        # those of the objects nested within it, go to the error sink
+        # instead of being warned about.
+        sink = current_sink()
+        if sink is None:
+            process()
+            self._warn_validation_errors()
+            return
+        with nesting() as outermost:
+            process()
+        if outermost:
+            sink.add(self._error_source, self.validation_errors.errors)
+
+    @property
+    def _error_source(self):
+        return self.ident
+
+    def _warn_validation_errors(self):
         if self.validation_errors.terrors:
             warnings.warn("{0} of class {1} has {2} Validation Errors"
                           "".format(self.ident, self.__class__.__name__,
                                     self.validation_errors.terrors),
                           UserWarning)
 
+    def materialize(self):
+        """
+        Process all the elements which have not yet been processed, and
+        return the collected validation errors.
+        """
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+
+            def _process_pending():
+                for key, policy, vctx in self._iter_policies():
+                    if key not in pending:
+                        continue
+                    if vctx is None:
+                        self._process_element(key, policy)
+                    else:
+                        self._process_element(key, policy, vctx)
+            self._process_and_report(_process_pending)
+        return self._validation_errors
+
+    def _validate(self):
+        self.materialize()
+        super(NakedSchemaObject, self)._validate()
+
 
 class SchemaControlledObject(NakedSchemaObject):
     legacy_schema_name = None
     supports_schema_name = None
     supports_schema_version_max = None
     supports_schema_version_min = None
+    _cache_policy_plan = True
 
     def __init__(self, *args, strict_schema=False, **kwargs):
         self._strict_schema = strict_schema
         super(SchemaControlledObject, self).__init__(*args, **kwargs)
 
+    @classmethod
+    def read_schema_header(cls, content, vctx, strict=True):
+        """
+        Read the schema name and version declared in the raw content of a
+        document the way instances of this class would, without processing
+        the rest of the document. If ``strict`` is ``False``, a missing or
+        invalid version is returned as ``None`` instead of raising.
+        """
+        name = ConfigOptionPolicy(vctx, ('schema', 'name')).get(content)
+        if cls.legacy_schema_name and name == cls.legacy_schema_name:
+            name = cls.supports_schema_name
+        try:
+            version = ConfigOptionPolicy(
+                vctx, ('schema', 'version'), parser=Decimal
+            ).get(content)
+        except ContextualConfigError:
+            if strict:
+                raise
+            version = None
+        return name, version
+
     def _stub_content(self):
         return {
             'schema_name': self.supports_schema_name,
@@ -156,8 +491,7 @@ class SchemaControlledObject(NakedSchemaObject):
                 '{0} v{1}'.format(self.schema_name, self.schema_version)
             )
 
-    def _process(self):
-        super(SchemaControlledObject, self)._process()
+    def _check_schema_decl(self):
         try:
             self._verify_schema_decl()
         except SchemaNotSupportedError as e:
@@ -165,27 +499,65 @@ class SchemaControlledObject(NakedSchemaObject):
                 raise
             self._validation_errors.add(e)
 
+    def _process(self):
+        super(SchemaControlledObject, self)._process()
+        self._check_schema_decl()
+
+    def _process_lazy(self):
+        super(SchemaControlledObject, self)._process_lazy()
+        self._check_schema_decl()
+
 
 class SchemaControlledYamlFile(SchemaControlledObject):
     supports_schema_name = '*'
     FileNotFoundExceptionType = None
     template = None
+    cache_documents = True
+    document_loader = None
 
-    def __init__(self, path, *args, **kwargs):
+    def __init__(self, path, *args, content=None, **kwargs):
+        # content, if provided, is the already parsed document at path.
+        # It is used as is, and the file is not read again.
         self._path = path
-        vctx = ValidationContext(
-            self._path,
-            locality=self.supports_schema_name or self.__class__.__name__
-        )
-        raw_content = self._get_yaml_file()
+        vctx = self.path_context(path)
+        if content is None:
+            raw_content = self._get_yaml_file()
+        else:
+            raw_content = content
         super(SchemaControlledYamlFile, self).__init__(
             raw_content, *args, vctx=vctx, **kwargs
         )
 
+    @classmethod
+    def path_context(cls, path):
+        return ValidationContext(
+            path, locality=cls.supports_schema_name or cls.__name__
+        )
+
+    @classmethod
+    def get_document_loader(cls, path):
+        # The loader is chosen by the extension of the file, unless the
+        # class provides one of its own. See tendril.schema.loaders.
+        loader = cls.document_loader
+        if loader is None:
+            loader = document_loaders.get(path)
+        return loader
+
+    @classmethod
+    def read_document(cls, path):
+        loader = cls.get_document_loader(path)
+        if cls.cache_documents:
+            return document_cache.load(path, loader)
+        return loader(path)
+
     @property
     def path(self):
         return self._path
 
+    @property
+    def _error_source(self):
+        return self._path
+
     def _generate_stub(self):
         template = Template(open(self.template).read())
         with open(self._path, 'w') as f:
@@ -196,7 +568,7 @@ class SchemaControlledYamlFile(SchemaControlledObject):
             self._generate_stub()
         if self.FileNotFoundExceptionType and not os.path.exists(self._path):
             raise self.FileNotFoundExceptionType(self._path)
-        return yaml.load(self._path)
+        return self.read_document(self._path)
 
 
 def load(manager):
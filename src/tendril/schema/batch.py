@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Batch Loading of Schema Controlled Files (:mod:`tendril.schema.batch`)
+======================================================================
+
+Infrastructure for :meth:`tendril.schema.manager.SchemaManager.load_many`,
+which loads many schema controlled files concurrently, using a pool of
+threads or of processes.
+
+Each file produces a :class:`LoadResult`, holding either the processed
+object or the error which prevented the file from being loaded, so that
+one unreadable file does not end the batch. Results produced by worker
+processes are in their portable form (see :meth:`LoadResult.portable`),
+since validation errors and processed objects cannot in general be
+pickled. Worker processes use the schema manager for the same prefix in
+their own interpreter, and therefore only know about schemas which are
+installed by the schema modules of the namespace.
+
+"""
+
+import pickle
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+
+class RenderedError(object):
+    """
+    Picklable stand-in for a validation error, holding its type, its
+    ``repr`` and its rendered form.
+    """
+    def __init__(self, error):
+        self.type = error.__class__.__name__
+        self.msg = getattr(error, 'msg', None)
+        self._repr = repr(error)
+        try:
+            self._rendered = error.render()
+        except Exception:
+            self._rendered = None
+
+    def render(self):
+        return self._rendered
+
+    def __repr__(self):
+        return self._repr
+
+
+class LoadResult(object):
+    def __init__(self, path, value=None, error=None, validation_errors=None):
+        self.path = path
+        self.value = value
+        self.error = error
+        self.validation_errors = validation_errors
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @classmethod
+    def from_load(cls, manager, path):
+        """
+        Load the file at ``path`` using ``manager``. Any exception raised
+        while loading the file, including those from reading or parsing
+        it, is captured as the ``error`` of the result.
+        """
+        try:
+            value = manager.load(path)
+        except Exception as e:
+            return cls(path, error=e)
+        return cls.from_value(path, value)
+
+    @classmethod
+    def from_value(cls, path, value):
+        return cls(path, value=value,
+                   validation_errors=list(value.validation_errors.errors))
+
+    def portable(self):
+        """
+        Return a picklable form of this result. Errors are replaced by
+        :class:`RenderedError` instances, and the processed object is
+        retained only if it can itself be pickled.
+        """
+        value = self.value
+        if value is not None:
+            try:
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                value = None
+        error = RenderedError(self.error) if self.error is not None else None
+        if self.validation_errors is not None:
+            validation_errors = [RenderedError(x)
+                                 for x in self.validation_errors]
+        else:
+            validation_errors = None
+        return LoadResult(self.path, value, error, validation_errors)
+
+    def __repr__(self):
+        if self.error is not None:
+            return "<LoadResult {0} {1!r}>".format(self.path, self.error)
+        return "<LoadResult {0} {1} errors>".format(
+            self.path, len(self.validation_errors or []))
+
+
+_managers = {}
+
+
+def _get_manager(prefix):
+    manager = importlib.import_module(prefix)
+    if hasattr(manager, 'load_many'):
+        return manager
+    if prefix not in _managers:
+        from tendril.schema.manager import SchemaManager
+        _managers[prefix] = SchemaManager(prefix)
+    return _managers[prefix]
+
+
+def _load_portable(prefix, path):
+    return LoadResult.from_load(_get_manager(prefix), path).portable()
+
+
+def load_many(manager, paths, workers=None, mode='thread', ordered=True):
+    if mode == 'thread':
+        executor = ThreadPoolExecutor(max_workers=workers)
+        args = (LoadResult.from_load, manager)
+    elif mode == 'process':
+        executor = ProcessPoolExecutor(max_workers=workers)
+        args = (_load_portable, manager.__name__)
+    else:
+        raise ValueError("Unsupported mode {0}".format(mode))
+
+    with executor:
+        futures = [executor.submit(args[0], args[1], path) for path in paths]
+        try:
+            if ordered:
+                for future in futures:
+                    yield future.result()
+            else:
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            # If the iteration is abandoned, loads which have not yet
+            # started are cancelled, so that only those already running
+            # are waited for.
+            for future in futures:
+                future.cancel()
+
+
+def load(manager):
+    pass
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Parsed Document Cache (:mod:`tendril.schema.cache`)
+===================================================
+
+Process-wide, bounded LRU cache of parsed documents, used by
+:class:`tendril.schema.base.SchemaControlledYamlFile` to avoid re-reading
+and re-parsing the same file every time it is loaded.
+
+Entries are keyed on the path of the file and the loader used to parse it,
+and are only considered valid while the fingerprint of the file, made up
+of its inode, modification time and size, is unchanged. Fragments merged
+in from a ``<path>.d`` directory are included in the fingerprint. An
+optional content hash can be added to the fingerprint to detect changes
+which do not alter any of these.
+
+Cached trees are held in serialized form, and every hit returns a fresh
+copy of the tree. Callers are free to mutate what they get.
+
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from copy import deepcopy
+from collections import OrderedDict
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+
+class DocumentCache(object):
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024,
+                 use_hash=False):
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_entries=None, max_bytes=None, use_hash=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if use_hash is not None:
+                self.use_hash = use_hash
+            self._evict()
+
+    @staticmethod
+    def _sources(path):
+        sources = [path]
+        dirpath = path + '.d'
+        if os.path.isdir(dirpath):
+            sources.extend(os.path.join(dirpath, x)
+                           for x in sorted(os.listdir(dirpath))
+                           if x.endswith('.yaml'))
+        return sources
+
+    def fingerprint(self, path):
+        """
+        Return the fingerprint of the file at the given path, or ``None``
+        if the file cannot be examined.
+        """
+        try:
+            rval = []
+            sources = self._sources(path)
+            for source in sources:
+                st = os.stat(source)
+                rval.append((source, st.st_ino, st.st_mtime_ns, st.st_size))
+            if self.use_hash:
+                digest = hashlib.sha1()
+                for source in sources:
+                    with open(source, 'rb') as f:
+                        digest.update(f.read())
+                rval.append(digest.hexdigest())
+            return tuple(rval)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _freeze(tree):
+        try:
+            data = pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+            return data, len(data)
+        except Exception:
+            return tree, None
+
+    @staticmethod
+    def _thaw(frozen):
+        if isinstance(frozen, bytes):
+            return pickle.loads(frozen)
+        return deepcopy(frozen)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._nbytes > self.max_bytes):
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= nbytes
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, nbytes = self._entries.pop(key)
+        self._nbytes -= nbytes
+
+    def load(self, path, loader):
+        """
+        Return a copy of the document at ``path`` as parsed by ``loader``,
+        from the cache if a valid entry exists.
+        """
+        fingerprint = self.fingerprint(path)
+        if fingerprint is None:
+            # Let the loader report the problem the way it normally does.
+            return loader(path)
+        key = (os.path.abspath(path), loader)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                if entry[0] == fingerprint:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    frozen = entry[1]
+                else:
+                    self._remove(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+        if entry is not None:
+            return self._thaw(frozen)
+
+        tree = loader(path)
+        frozen, nbytes = self._freeze(tree)
+        if nbytes is None:
+            nbytes = sum(x[3] for x in fingerprint if isinstance(x, tuple))
+        if nbytes > self.max_bytes:
+            return tree
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (fingerprint, frozen, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+        if isinstance(frozen, bytes):
+            # The cache holds its own serialized copy.
+            return tree
+        return deepcopy(tree)
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._nbytes = 0
+                return
+            path = os.path.abspath(path)
+            for key in [k for k in self._entries.keys() if k[0] == path]:
+                self._remove(key)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'nbytes': self._nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<DocumentCache {0}/{1} entries, {2} hits, {3} misses>" \
+               "".format(len(self._entries), self.max_entries,
+                         self.hits, self.misses)
+
+
+document_cache = DocumentCache()
+
+
+def load(manager):
+    pass
@@ -22,15 +22,29 @@ Reusable Schema Elements (:mod:`tendril.schema.helpers`)
 ========================================================
 """
 
+import os
+import threading
 from six import iteritems
+from array import array
 from inspect import isclass
 
-from collections import MutableMapping
-from collections import MutableSequence
+from collections.abc import Sequence
+from collections.abc import MutableMapping
+from collections.abc import MutableSequence
 
 from tendril.validation.base import ValidatableBase
 from tendril.validation.base import ValidationError
+from tendril.validation.base import ValidationPolicy
 from tendril.validation.files import ExtantFile
+from tendril.validation.configs import CompactStateMixin
+from tendril.schema.statcache import stat_cache
+from tendril.schema.sink import nesting_depth
+from tendril.schema.sink import nested_at
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 try:
     from tendril.utils.types import ParseException
@@ -39,6 +53,37 @@ except ImportError:
     _exc = ValidationError
 
 
+def _build_item(item, objtype, vctx, args):
+    if isclass(objtype) and \
+            issubclass(objtype, ValidatableBase):
+        value = objtype(item, vctx=vctx, **args)
+        value.validate()
+    elif objtype:
+        value = objtype(item)
+    else:
+        value = item
+    return value
+
+
+_worker = threading.local()
+
+
+def _build_item_on_worker(item, objtype, vctx, args, depth):
+    # Collections nested within items being built on an executor are
+    # parsed serially, since a worker waiting on tasks queued behind it
+    # on its own executor would never be woken. The nesting depth of the
+    # thread which submitted the item is carried over, so that the item
+    # is treated as nested for error reporting as it would be if it were
+    # built on that thread.
+    previous = getattr(_worker, 'active', False)
+    _worker.active = True
+    try:
+        with nested_at(depth):
+            return _build_item(item, objtype, vctx, args)
+    finally:
+        _worker.active = previous
+
+
 class MultilineString(list):
     def __init__(self, value):
         super(MultilineString, self).__init__(value)
@@ -53,13 +98,25 @@ class SchemaObjectCollection(ValidatableBase):
     _validator = None
     _allow_empty = True
 
-    def __init__(self, content, *args, **kwargs):
+    # Executor on which items are parsed, if any. See _load_entries.
+    _executor = None
+    _executor_chunksize = 16
+
+    def __init__(self, content, *args, executor=None, **kwargs):
+        self._item_args = {}
         for arg in self._pass_args:
-            setattr(self, arg, kwargs.pop(arg))
+            self._item_args[arg] = kwargs.pop(arg)
+            setattr(self, arg, self._item_args[arg])
         super(SchemaObjectCollection, self).__init__(*args, **kwargs)
+        self._item_executor = executor or self._executor
         self._source_content = content
         self._content = self._empty_container
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_item_executor'] = None
+        return state
+
     @property
     def _empty_container(self):
         raise NotImplementedError
@@ -69,45 +126,136 @@ class SchemaObjectCollection(ValidatableBase):
         return self._content
 
     def _parse_item_with(self, item, objtype):
+        value = _build_item(item, objtype, self._validation_context,
+                            self._item_args)
+        self._merge_item(value, objtype)
+        return value
+
+    def _merge_item(self, value, objtype):
         if isclass(objtype) and \
                 issubclass(objtype, ValidatableBase):
-            if self._pass_args:
-                args = {k: getattr(self, k) for k in self._pass_args}
-                value = objtype(item, vctx=self._validation_context, **args)
-            else:
-                value = objtype(item, vctx=self._validation_context)
-            value.validate()
             self._validation_errors.add(value.validation_errors)
-        elif objtype:
-            value = objtype(item)
-        else:
-            value = item
-        return value
 
-    def _parse_item(self, item):
+    def _match_parser(self, itype):
+        default_parser = None
+        for sig, parser in self._objtype:
+            if sig == 'default':
+                default_parser = parser
+                continue
+            if issubclass(itype, sig):
+                return parser
+        return default_parser
+
+    def _dispatch(self, itype):
+        # The parser for each type of item is found once and cached on the
+        # class. The cache is discarded if _objtype is replaced.
+        cls = self.__class__
+        cache = cls.__dict__.get('_dispatch_cache', None)
+        if cache is None or cache[0] is not self._objtype:
+            cache = (self._objtype, {})
+            cls._dispatch_cache = cache
+        try:
+            return cache[1][itype]
+        except KeyError:
+            parser = self._match_parser(itype)
+            cache[1][itype] = parser
+            return parser
+
+    def _item_parser(self, item):
         if isinstance(self._objtype, list):
-            default_parser = None
-            for sig, parser in self._objtype:
-                if sig == 'default':
-                    default_parser = parser
-                    continue
-                if isinstance(item, sig):
-                    return self._parse_item_with(item, parser)
-            return self._parse_item_with(item, default_parser)
+            return self._dispatch(type(item))
         else:
-            return self._parse_item_with(item, self._objtype)
+            return self._objtype
 
-    def _validate_item(self, item):
+    def _parse_item(self, item):
+        return self._parse_item_with(item, self._item_parser(item))
+
+    def _check_item(self, item):
+        # Returns whether the item is to be parsed, and the validation
+        # error, if any, explaining why it is not.
         if not item:
-            return False
+            return False, None
         if self._validator:
             try:
                 self._validator(item)
-                return True
+                return True, None
             except _exc as e:
-                self._validation_errors.add(e)
-                return False
-        return True
+                return False, e
+        return True, None
+
+    def _validate_item(self, item):
+        ok, error = self._check_item(item)
+        if error is not None:
+            self._validation_errors.add(error)
+        return ok
+
+    def _can_parse_concurrently(self):
+        cls = self.__class__
+        return cls._validate_item is SchemaObjectCollection._validate_item \
+            and cls._parse_item is SchemaObjectCollection._parse_item \
+            and cls._parse_item_with is \
+            SchemaObjectCollection._parse_item_with
+
+    def _load_entries(self, entries):
+        """
+        Validate and parse the items of the given ``(key, item)`` pairs,
+        yielding ``(key, value)`` for each item which is retained.
+
+        If the collection has an executor, either passed in as
+        ``executor`` or set as ``_executor`` on the class, the items are
+        parsed on it. The results and validation errors are still taken
+        in the order of the entries, and are the same as when the items
+        are parsed one after the other. Parsing on a process pool requires
+        the items, the item types and the parsed values to be picklable.
+        Collections which override the validation or parsing of items
+        always parse them one after the other.
+
+        Collections nested within items which are themselves being parsed
+        on an executor parse their items one after the other, even if they
+        have an executor of their own. An executor shared by nested
+        collections, such as one set on a common base class, would
+        otherwise deadlock once all its workers are waiting on the items
+        of nested collections.
+        """
+        executor = self._item_executor
+        if executor is None or getattr(_worker, 'active', False) or \
+                not self._can_parse_concurrently():
+            for key, item in entries:
+                if not self._validate_item(item):
+                    continue
+                yield key, self._parse_item(item)
+            return
+
+        skipped = {}
+        tasks = []
+        for idx, (key, item) in enumerate(entries):
+            ok, error = self._check_item(item)
+            if not ok:
+                skipped[idx] = (key, error)
+                continue
+            objtype = self._item_parser(item)
+            tasks.append((idx, key, item, objtype))
+
+        results = executor.map(
+            _build_item_on_worker,
+            [x[2] for x in tasks], [x[3] for x in tasks],
+            [self._validation_context] * len(tasks),
+            [self._item_args] * len(tasks),
+            [nesting_depth()] * len(tasks),
+            chunksize=self._executor_chunksize
+        )
+        nentries = len(tasks) + len(skipped)
+        tasks = iter(tasks)
+        for idx in range(nentries):
+            if idx in skipped:
+                key, error = skipped[idx]
+                if error is not None:
+                    self._validation_errors.add(error)
+                continue
+            _, key, _, objtype = next(tasks)
+            value = next(results)
+            self._merge_item(value, objtype)
+            yield key, value
 
     def _validate(self):
         pass
@@ -128,57 +276,374 @@ class SchemaObjectCollection(ValidatableBase):
         return len(self._content)
 
 
+class DuplicateHandleError(CompactStateMixin, ValidationError):
+    __slots__ = ('_policy', 'detail', '_handle')
+    msg = "Duplicate Handle"
+
+    def __init__(self, policy, handle):
+        super(DuplicateHandleError, self).__init__(policy)
+        self._handle = handle
+
+    def __repr__(self):
+        return "<DuplicateHandleError {0} {1}>" \
+               "".format(self.policy.context, self._handle)
+
+    def render(self):
+        return {
+            'is_error': self.policy.is_error,
+            'group': self.msg,
+            'headline': "'{0}' used more than once in {1}"
+                        "".format(self._handle, self.policy.context.render()),
+            'detail': "Each item in this list should have a unique handle.",
+        }
+
+
+class InvalidItemError(CompactStateMixin, ValidationError):
+    __slots__ = ('_policy', 'detail', '_index', '_value')
+    msg = "Invalid List Item"
+
+    def __init__(self, policy, index, value):
+        super(InvalidItemError, self).__init__(policy)
+        self._index = index
+        self._value = value
+
+    def __repr__(self):
+        return "<InvalidItemError {0} {1}>" \
+               "".format(self.policy.context, self._index)
+
+    def render(self):
+        return {
+            'is_error': self.policy.is_error,
+            'group': self.msg,
+            'headline': "'{0}' Invalid at position {1} in {2}"
+                        "".format(self._value, self._index,
+                                  self.policy.context.render()),
+            'detail': "This item could not be converted to the type of the "
+                      "list, and has been left out.",
+        }
+
+
+class _HandleIndex(object):
+    # Handles of the items of a list, in the same order as the items, along
+    # with the number of items with each handle and the first such item.
+    # The first item is looked up again for handles in stale, for which it
+    # may have changed.
+    def __init__(self, attr, items):
+        self.attr = attr
+        self.handles = [getattr(x, attr) for x in items]
+        self.counts = {}
+        self.first = {}
+        self.stale = set()
+        for handle, item in zip(self.handles, items):
+            if handle in self.counts:
+                self.counts[handle] += 1
+            else:
+                self.counts[handle] = 1
+                self.first[handle] = item
+
+    def lookup(self, handle, items):
+        if handle in self.stale:
+            self.first[handle] = items[self.handles.index(handle)]
+            self.stale.discard(handle)
+        return self.first[handle]
+
+    def inserted(self, index, item):
+        handle = getattr(item, self.attr)
+        self.handles.insert(index, handle)
+        count = self.counts.get(handle, 0)
+        self.counts[handle] = count + 1
+        if not count:
+            self.first[handle] = item
+        else:
+            self.stale.add(handle)
+
+    def removed(self, index, item):
+        handle = self.handles.pop(index)
+        self.counts[handle] -= 1
+        if not self.counts[handle]:
+            del self.counts[handle]
+            del self.first[handle]
+            self.stale.discard(handle)
+        elif self.first[handle] is item:
+            self.stale.add(handle)
+
+    def duplicates(self):
+        return [k for k, v in self.counts.items() if v > 1]
+
+
+class HandlesView(Sequence):
+    """
+    Read-only view of the handles of the items of a
+    :class:`SchemaObjectList`, in order. Membership tests do not scan the
+    list.
+    """
+    def __init__(self, owner):
+        self._owner = owner
+
+    @property
+    def _handles(self):
+        return self._owner._get_handle_index().handles
+
+    def __getitem__(self, item):
+        return self._handles[item]
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __iter__(self):
+        return iter(self._handles)
+
+    def __contains__(self, item):
+        try:
+            return item in self._owner._get_handle_index().counts
+        except TypeError:
+            return item in self._handles
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        rval = self.__eq__(other)
+        if rval is NotImplemented:
+            return rval
+        return not rval
+
+    def __repr__(self):
+        return repr(self._handles)
+
+
 class SchemaObjectList(SchemaObjectCollection, MutableSequence):
+    # Set to True in subclasses to report items with duplicate handles as
+    # validation errors.
+    _unique_handles = False
+
     def __init__(self, *args, **kwargs):
+        self._handle_index = None
         super(SchemaObjectList, self).__init__(*args, **kwargs)
         if not self._source_content and self._allow_empty:
             return
-        for item in self._source_content:
-            if not self._validate_item(item):
-                continue
-            self._content.append(self._parse_item(item))
+        self._load_items()
+        if self._unique_handles and self._has_handles():
+            self._check_handles()
+
+    def _load_items(self):
+        for _, value in self._load_entries(enumerate(self._source_content)):
+            self._content.append(value)
+
+    def __getstate__(self):
+        state = super(SchemaObjectList, self).__getstate__()
+        state['_handle_index'] = None
+        return state
 
     @property
     def _empty_container(self):
         return []
 
-    def get(self, item):
-        if not self._objtype or not hasattr(self._objtype, 'handle'):
+    def _has_handles(self):
+        return self._objtype and hasattr(self._objtype, 'handle')
+
+    def _get_handle_index(self):
+        # The index of handles is built on first use, and kept up to date as
+        # items are added and removed through the list. Changes to the
+        # handles of items already in the list are not tracked, and need
+        # _invalidate_handle_index() to be called.
+        if not self._has_handles():
             raise NotImplementedError("handle not specified for {0}"
                                       "".format(self.__class__.__name__))
+        if self._handle_index is None:
+            self._handle_index = _HandleIndex(self._objtype.handle,
+                                              self.content)
+        return self._handle_index
+
+    def _invalidate_handle_index(self):
+        self._handle_index = None
 
-        for candidate in self.content:
-            if getattr(candidate, self._objtype.handle) == item:
-                return candidate
+    def _check_handles(self):
+        policy = ValidationPolicy(self._validation_context)
+        for handle in self._get_handle_index().duplicates():
+            self._validation_errors.add(DuplicateHandleError(policy, handle))
+
+    def get(self, item):
+        index = self._get_handle_index()
+        try:
+            return index.lookup(item, self.content)
+        except KeyError:
+            pass
+        except TypeError:
+            for candidate in self.content:
+                if getattr(candidate, self._objtype.handle) == item:
+                    return candidate
 
         raise ValueError("{0} with handle {1} not found."
                          "".format(self._objtype.__name__, item))
 
     @property
     def handles(self):
-        if not self._objtype or not hasattr(self._objtype, 'handle'):
-            raise NotImplementedError("handle not specified for {0}"
-                                      "".format(self.__class__.__name__))
-        return [getattr(x, self._objtype.handle) for x in self.content]
+        self._get_handle_index()
+        return HandlesView(self)
 
     def insert(self, index, item):
-        return self._content.insert(index, item)
+        self._content.insert(index, item)
+        if self._handle_index is not None:
+            if index < 0:
+                index = max(len(self._content) - 1 + index, 0)
+            self._handle_index.inserted(min(index, len(self._content) - 1),
+                                        item)
+
+    def __setitem__(self, key, value):
+        if self._handle_index is not None and not isinstance(key, slice):
+            # The item is looked up first, so that indices out of range
+            # raise IndexError before the index of handles is changed.
+            item = self._content[key]
+            if key < 0:
+                key += len(self._content)
+            self._handle_index.removed(key, item)
+            self._content[key] = value
+            self._handle_index.inserted(key, value)
+            return
+        self._content[key] = value
+        self._handle_index = None
+
+    def __delitem__(self, key):
+        if self._handle_index is not None and not isinstance(key, slice):
+            item = self._content[key]
+            if key < 0:
+                key += len(self._content)
+            del self._content[key]
+            self._handle_index.removed(key, item)
+            return
+        del self._content[key]
+        self._handle_index = None
+
+
+class CachedExtantFile(ExtantFile):
+    """
+    :class:`tendril.validation.files.ExtantFile` which checks for the
+    file using :data:`tendril.schema.statcache.stat_cache` where possible.
+    """
+    def _validate(self):
+        if stat_cache.exists(self.filepath):
+            self._validated = True
+            return
+        super(CachedExtantFile, self)._validate()
 
 
 class FileList(SchemaObjectList):
-    _objtype = ExtantFile
+    _objtype = CachedExtantFile
     _pass_args = ['basedir']
 
+    def _load_items(self):
+        # All the directories containing the files are listed up front,
+        # and the files are then checked against the listings.
+        with stat_cache.scope():
+            paths = []
+            for item in self._source_content:
+                try:
+                    paths.append(os.path.join(self.basedir, item))
+                except TypeError:
+                    continue
+            stat_cache.prefetch(paths)
+            super(FileList, self)._load_items()
+
+
+class ScalarList(SchemaObjectList):
+    """
+    Compact list of numbers, stored in an :class:`array.array` of the
+    ``_typecode`` of the class instead of as a list of Python objects.
+
+    Subclasses set ``_objtype`` to the scalar type of the items, such as
+    ``int`` or ``float``, and ``_typecode`` to the corresponding array
+    typecode. Types which have no array representation, such as
+    :class:`decimal.Decimal`, cannot be used.
+
+    The items are converted together, using NumPy if it is installed and
+    the typecode is a floating point one. NumPy may wrap integers which
+    are out of range for the typecode around instead of rejecting them,
+    depending on its version, and is therefore not used for integer
+    typecodes. Items which cannot be converted are left out of the list
+    and reported as :class:`InvalidItemError` validation errors, along
+    with their positions in the source content. Items which are ``None``
+    are skipped.
+    """
+    _objtype = float
+    _typecode = 'd'
+    _use_numpy = True
+
+    @property
+    def _empty_container(self):
+        return array(self._typecode)
+
+    def _validate_item(self, item):
+        # Unlike in other lists, falsy items such as 0 are valid here.
+        if item is None:
+            return False
+        if self._validator:
+            try:
+                self._validator(item)
+            except _exc as e:
+                self._validation_errors.add(e)
+                return False
+        return True
+
+    def _load_items(self):
+        items = [(idx, x) for idx, x in enumerate(self._source_content)
+                 if self._validate_item(x)]
+        try:
+            self._content = self._convert([x for _, x in items])
+            return
+        except (TypeError, ValueError, OverflowError):
+            pass
+        # Some of the items are not valid. Convert them one at a time to
+        # find out which.
+        policy = ValidationPolicy(self._validation_context)
+        content = self._empty_container
+        for idx, item in items:
+            try:
+                content.append(self._objtype(item))
+            except (TypeError, ValueError, OverflowError):
+                self._validation_errors.add(
+                    InvalidItemError(policy, idx, item)
+                )
+        self._content = content
+
+    def _convert(self, items):
+        if numpy is not None and self._use_numpy and \
+                self._typecode in ('f', 'd'):
+            values = numpy.asarray(items, dtype=numpy.dtype(self._typecode))
+            if values.ndim != 1:
+                raise ValueError("Expected a list of scalars")
+            rval = array(self._typecode)
+            rval.frombytes(values.tobytes())
+            return rval
+        return array(self._typecode, map(self._objtype, items))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = array(self._typecode, map(self._objtype, value))
+        else:
+            value = self._objtype(value)
+        self._content[key] = value
+
+    def __delitem__(self, key):
+        del self._content[key]
+
+    def insert(self, index, item):
+        self._content.insert(index, self._objtype(item))
+
+    def __repr__(self):
+        return "<{0} {1}>".format(self.__class__.__name__,
+                                  self._content.tolist())
+
 
 class SchemaObjectMapping(SchemaObjectCollection, MutableMapping):
     def __init__(self, *args, **kwargs):
         super(SchemaObjectMapping, self).__init__(*args, **kwargs)
         if not self._source_content and self._allow_empty:
             return
-        for k, v in iteritems(self._source_content):
-            if not self._validate_item(v):
-                continue
-            self._content[k] = self._parse_item(v)
+        for k, v in self._load_entries(iteritems(self._source_content)):
+            self._content[k] = v
 
     @property
     def _empty_container(self):
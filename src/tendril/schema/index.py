@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Schema Index of Directory Trees (:mod:`tendril.schema.index`)
+=============================================================
+
+Incremental index of the schema controlled files within a directory tree,
+recording the schema name and version declared by each file. The header
+of each file is read using
+:meth:`tendril.schema.base.SchemaControlledObject.read_schema_header`,
+without processing the rest of the file.
+
+By default, files with any of the extensions registered in
+:data:`tendril.schema.loaders.document_loaders` are indexed, and each is
+read by the loader registered for it.
+
+Fragments in a ``<file>.d`` directory next to an indexed file are merged
+into that file by the YAML loader, and are not indexed on their own.
+
+The index is persisted to a JSON file, by default ``.schema-index.json``
+at the root of the tree. On subsequent updates, only files whose
+modification time or size has changed, or whose fragments have changed,
+are examined again. Lookups by
+schema name and version range are answered from the index alone.
+
+.. code-block:: python
+
+    index = SchemaIndex('/path/to/projects')
+    index.update()
+    index.save()
+    index.find('ProjectConfig', vmin='1.0')
+
+"""
+
+import os
+import json
+from decimal import Decimal
+
+from tendril.schema.base import SchemaControlledYamlFile
+from tendril.schema.loaders import document_loaders
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+
+INDEX_VERSION = 2
+
+
+class SchemaIndex(object):
+    def __init__(self, root, index_path=None, extensions=None):
+        self._root = os.path.abspath(root)
+        self._index_path = os.path.abspath(
+            index_path or os.path.join(self._root, '.schema-index.json')
+        )
+        if extensions is None:
+            extensions = document_loaders.extensions()
+        self._extensions = tuple(extensions)
+        self._entries = {}
+        self._read()
+
+    @property
+    def root(self):
+        return self._root
+
+    def _read(self):
+        try:
+            with open(self._index_path, 'r') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return
+        if content.get('version') != INDEX_VERSION:
+            return
+        self._entries = content['entries']
+
+    def save(self):
+        content = {'version': INDEX_VERSION, 'entries': self._entries}
+        tmppath = self._index_path + '.tmp'
+        with open(tmppath, 'w') as f:
+            json.dump(content, f)
+        os.replace(tmppath, self._index_path)
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self._root):
+            indexed = [x for x in filenames if x.endswith(self._extensions)]
+            fragments = set(x + '.d' for x in indexed)
+            dirnames[:] = [x for x in dirnames
+                           if not x.startswith('.') and x not in fragments]
+            for filename in indexed:
+                path = os.path.join(dirpath, filename)
+                if path != self._index_path:
+                    yield path
+
+    @staticmethod
+    def _fragments(path):
+        # The same fragments as are read by the YAML loader and
+        # fingerprinted by the document cache.
+        dirpath = path + '.d'
+        if not os.path.isdir(dirpath):
+            return []
+        rval = []
+        for filename in sorted(os.listdir(dirpath)):
+            if not filename.endswith('.yaml'):
+                continue
+            try:
+                st = os.stat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            rval.append([filename, st.st_mtime_ns, st.st_size])
+        return rval
+
+    @staticmethod
+    def _examine(path):
+        rval = {'name': None, 'version': None, 'error': None}
+        try:
+            content = SchemaControlledYamlFile.get_document_loader(path)(path)
+            if not isinstance(content, dict):
+                raise ValueError("Not a mapping")
+            vctx = SchemaControlledYamlFile.path_context(path)
+            name, version = SchemaControlledYamlFile.read_schema_header(
+                content, vctx, strict=False
+            )
+            rval['name'] = name
+            if version is not None:
+                rval['version'] = str(version)
+        except Exception as e:
+            rval['error'] = repr(e)
+        return rval
+
+    def update(self):
+        """
+        Bring the index up to date with the tree, examining only the
+        files which are new or have changed since they were last examined.
+        Returns the number of files examined and removed from the index.
+        """
+        seen = set()
+        examined = 0
+        for path in self._walk():
+            relpath = os.path.relpath(path, self._root)
+            seen.add(relpath)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            fragments = self._fragments(path)
+            entry = self._entries.get(relpath, None)
+            if entry is not None and entry['mtime'] == st.st_mtime_ns and \
+                    entry['size'] == st.st_size and \
+                    entry['fragments'] == fragments:
+                continue
+            entry = self._examine(path)
+            entry.update({'mtime': st.st_mtime_ns, 'size': st.st_size,
+                          'fragments': fragments})
+            self._entries[relpath] = entry
+            examined += 1
+        removed = [x for x in self._entries.keys() if x not in seen]
+        for relpath in removed:
+            del self._entries[relpath]
+        logger.debug("Updated schema index of {0} : {1} examined, "
+                     "{2} removed".format(self._root, examined, len(removed)))
+        return examined, len(removed)
+
+    def find(self, schema_name, vmin=None, vmax=None):
+        """
+        Return the paths of the indexed files declaring the given schema,
+        with versions between ``vmin`` and ``vmax`` (inclusive) if these
+        are provided.
+        """
+        vmin = Decimal(str(vmin)) if vmin is not None else None
+        vmax = Decimal(str(vmax)) if vmax is not None else None
+        rval = []
+        for relpath, entry in self._entries.items():
+            if entry['name'] != schema_name:
+                continue
+            if vmin is not None or vmax is not None:
+                if entry['version'] is None:
+                    continue
+                version = Decimal(entry['version'])
+                if vmin is not None and version < vmin:
+                    continue
+                if vmax is not None and version > vmax:
+                    continue
+            rval.append(os.path.join(self._root, relpath))
+        return sorted(rval)
+
+    def schemas(self):
+        """
+        Return a dictionary of the schemas declared by the indexed files,
+        and the versions of each which were found.
+        """
+        rval = {}
+        for entry in self._entries.values():
+            if entry['name'] is None:
+                continue
+            versions = rval.setdefault(entry['name'], set())
+            if entry['version'] is not None:
+                versions.add(Decimal(entry['version']))
+        return {k: sorted(v) for k, v in rval.items()}
+
+    def errors(self):
+        return {os.path.join(self._root, k): v['error']
+                for k, v in self._entries.items() if v['error']}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<SchemaIndex {0} {1} files>".format(self._root, len(self))
+
+
+def load(manager):
+    pass
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Document Loaders (:mod:`tendril.schema.loaders`)
+================================================
+
+Registry of the loaders used to read schema controlled files, selected
+by the extension of the file. A loader is any callable which takes the
+path of a file and returns the parsed document. Loaders are also used as
+part of the key of :data:`tendril.schema.cache.document_cache`, and
+should therefore be hashable and reused rather than created on demand.
+
+The following loaders are registered by default :
+
+  - ``.yaml`` and ``.yml`` files are read by :data:`yaml_loader`, which
+    uses the libyaml based ``CLoader`` when PyYAML has been built with it,
+    and the pure python ``Loader`` otherwise. Fragments in ``<path>.d``
+    are merged in, as is done by :func:`tendril.utils.files.yml.load`.
+  - ``.json`` files are read by :data:`json_loader`, using the standard
+    library JSON parser. Fragments are not merged in. JSON has no date
+    type, so dates in JSON files remain strings.
+
+Files with any other extension are read by :data:`yaml_loader`.
+Additional loaders can be registered with :data:`document_loaders`.
+Individual processors may also use a loader of their own by setting
+:attr:`tendril.schema.base.SchemaControlledYamlFile.document_loader`.
+
+.. code-block:: python
+
+    document_loaders.register('.toml', toml_loader)
+
+"""
+
+import os
+import json
+
+import yaml
+from tendril.utils.files.yml import data_merge
+
+try:
+    from yaml import CLoader as FastYamlLoader
+except ImportError:
+    FastYamlLoader = yaml.Loader
+
+
+class YamlDocumentLoader(object):
+    def __init__(self, loader=None):
+        self.loader = loader or FastYamlLoader
+
+    @staticmethod
+    def _sources(path):
+        rval = []
+        if os.path.isfile(path):
+            rval.append(path)
+        dirpath = path + '.d'
+        if os.path.isdir(dirpath):
+            rval.extend(x for x in (os.path.join(dirpath, y)
+                                    for y in sorted(os.listdir(dirpath)))
+                        if os.path.isfile(x) and x.endswith('.yaml'))
+        return rval
+
+    def __call__(self, path):
+        sources = self._sources(path)
+        if not sources:
+            raise IOError("YAML file not found : {0}".format(path))
+        rval = None
+        for source in sources:
+            with open(source, 'r') as f:
+                rval = data_merge(rval, yaml.load(f, Loader=self.loader))
+        return rval
+
+    def __eq__(self, other):
+        return isinstance(other, YamlDocumentLoader) and \
+            self.loader is other.loader
+
+    def __hash__(self):
+        return hash((YamlDocumentLoader, self.loader))
+
+    def __repr__(self):
+        return "<YamlDocumentLoader {0}>".format(self.loader.__name__)
+
+
+class JsonDocumentLoader(object):
+    def __call__(self, path):
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def __eq__(self, other):
+        return isinstance(other, JsonDocumentLoader)
+
+    def __hash__(self):
+        return hash(JsonDocumentLoader)
+
+    def __repr__(self):
+        return "<JsonDocumentLoader>"
+
+
+yaml_loader = YamlDocumentLoader()
+json_loader = JsonDocumentLoader()
+
+
+class LoaderRegistry(object):
+    def __init__(self, default=None):
+        self._loaders = {}
+        self.default = default
+
+    @staticmethod
+    def _normalize(extension):
+        extension = extension.lower()
+        if not extension.startswith('.'):
+            extension = '.' + extension
+        return extension
+
+    def register(self, extension, loader):
+        """
+        Use ``loader`` to read files with the given extension, replacing
+        any loader previously registered for it.
+        """
+        self._loaders[self._normalize(extension)] = loader
+
+    def unregister(self, extension):
+        self._loaders.pop(self._normalize(extension), None)
+
+    def get(self, path):
+        """
+        Return the loader to use for the file at the given path.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        return self._loaders.get(extension, self.default)
+
+    def extensions(self):
+        return tuple(sorted(self._loaders.keys()))
+
+    def __repr__(self):
+        return "<LoaderRegistry {0}>".format(', '.join(self.extensions()))
+
+
+document_loaders = LoaderRegistry(default=yaml_loader)
+document_loaders.register('.yaml', yaml_loader)
+document_loaders.register('.yml', yaml_loader)
+document_loaders.register('.json', json_loader)
+
+
+def load(manager):
+    pass
@@ -23,70 +23,246 @@ Tendril Schema Manager (:mod:`tendril.schema.manager`)
 """
 
 
+import sys
 import importlib
+import threading
 
 from tendril.validation.base import ValidationContext
 from tendril.validation.configs import ConfigOptionPolicy
 from tendril.validation.schema import SchemaNotSupportedError
 from tendril.schema.base import SchemaControlledYamlFile
+from tendril.schema.registry import SchemaModuleRecord
+from tendril.schema.manifest import default_manifest_path
+from tendril.schema.manifest import get_schema_modules
+from tendril.schema.batch import load_many
+from tendril.schema.aio import AsyncSchemaLoader
+from tendril.schema.statcache import stat_cache
 
-from tendril.utils.versions import get_namespace_package_names
 from tendril.utils import log
 logger = log.get_logger(__name__, log.DEBUG)
 
 
 class SchemaManager(object):
-    def __init__(self, prefix):
+    """
+    Registry of the schemas provided by the modules of a namespace.
+
+    Schema modules are not imported when the manager is created. Instead,
+    each module is examined to find out which schemas it provides (see
+    :mod:`tendril.schema.registry`), and is imported only when one of its
+    schemas is first needed. Modules which cannot be examined this way
+    are imported when a schema cannot be found otherwise, or when the
+    complete list of schemas is asked for.
+
+    The results of examining the modules are kept in a manifest on disk,
+    (see :mod:`tendril.schema.manifest`), which is used in place of
+    scanning the namespace for as long as it remains valid. ``manifest``
+    may be the path of the manifest file to use, or ``False`` to always
+    scan the namespace.
+    """
+    def __init__(self, prefix, manifest=True):
         self._prefix = prefix
+        self._path = self._get_package_path(prefix)
+        if manifest is True:
+            manifest = default_manifest_path(prefix, self._path)
+        self._manifest_path = manifest or None
+        self._package_attrs = self._get_package_attrs(prefix)
         self._schemas = {}
         self._file_schemas = {}
-        self._docs = []
+        self._modules = []
+        self._providers = {}
+        self._loading = None
+        self._external = SchemaModuleRecord(None)
+        self._external.loaded = True
+        self._lock = threading.RLock()
+        self._async_loader = None
         self._load_schemas()
         self._validation_context = ValidationContext(self.__module__)
 
+    @staticmethod
+    def _get_package_path(prefix):
+        package = sys.modules.get(prefix, None)
+        return list(getattr(package, '__path__', None) or []) or None
+
+    @staticmethod
+    def _get_package_attrs(prefix):
+        # The manager replaces the package in sys.modules. The import
+        # system reads these from the parent package when importing any
+        # of its submodules, so they are retained from the real package.
+        package = sys.modules.get(prefix, None)
+        return {x: getattr(package, x, None)
+                for x in ('__spec__', '__loader__', '__package__')}
+
     def _load_schemas(self):
-        logger.debug("Loading schema modules from {0}".format(self._prefix))
-        modules = list(get_namespace_package_names(self._prefix))
-        for m_name in modules:
-            if m_name == __name__:
-                continue
-            m = importlib.import_module(m_name)
-            m.load(self)
-        logger.debug("Done loading schema modules from {0}".format(self._prefix))
+        logger.debug("Scanning schema modules from {0}".format(self._prefix))
+        records = get_schema_modules(self._prefix, self._path,
+                                     manifest_path=self._manifest_path,
+                                     exclude=__name__)
+        for record in records:
+            self._install_record(record)
+        logger.debug("Done scanning schema modules from {0}"
+                     "".format(self._prefix))
+
+    def _install_record(self, record):
+        self._modules.append(record)
+        for name in record.schema_names:
+            self._providers[name] = record
+
+    def _import(self, record):
+        with self._lock:
+            if record.loaded:
+                return
+            logger.debug("Loading schema module {0}".format(record.name))
+            m = importlib.import_module(record.name)
+            previous, self._loading = self._loading, record
+            try:
+                m.load(self)
+            finally:
+                self._loading = previous
+            record.loaded = True
+            if record.opaque:
+                for name in record.schema_names:
+                    self._providers.setdefault(name, record)
+
+    def _import_opaque(self):
+        for record in self._modules:
+            if record.opaque and not record.loaded:
+                self._import(record)
+
+    def _import_all(self):
+        for record in self._modules:
+            if not record.loaded:
+                self._import(record)
+
+    def _resolve(self, name):
+        if name in self._schemas:
+            return
+        record = self._providers.get(name, None)
+        if record is not None:
+            self._import(record)
+        if name not in self._schemas:
+            self._import_opaque()
 
     def load_schema(self, name, processor, doc):
         logger.debug("Installing schema definition {0}".format(name))
         self._schemas[name] = processor
         if issubclass(processor, SchemaControlledYamlFile):
             self._file_schemas[name] = processor
-        self._docs.append((name, doc))
+        record = self._loading or self._external
+        record.install(name, processor.__name__, doc)
+        self._providers.setdefault(name, record)
+
+    @property
+    def _records(self):
+        return self._modules + [self._external]
+
+    def _schema_names(self):
+        self._import_opaque()
+        rval = []
+        for record in self._records:
+            rval.extend(x for x in record.schema_names if x not in rval)
+        return rval
 
     def __getattr__(self, item):
         if item == '__file__':
             return None
+        if item == '__name__':
+            return self._prefix
         if item == '__path__':
-            return None
+            return self._path
+        if item in self._package_attrs:
+            return self._package_attrs[item]
         if item == '__len__':
-            return len(self._schemas.keys())
+            return len(self._schema_names())
         if item == '__all__':
-            return list(self._schemas.keys()) + \
-                   ['load_schema', 'load', 'doc_render']
+            return self._schema_names() + \
+                   ['load_schema', 'load', 'load_many', 'aload',
+                    'aload_many', 'doc_render']
+        if item.startswith('__') or item in ('_schemas', '_providers'):
+            raise AttributeError(item)
+        self._resolve(item)
         return self._schemas[item]
 
+    def _get_file_schema(self, name):
+        # Returns the processor for the schema controlled file schema of
+        # the given name, or None if there is no such schema. The name is
+        # read from the file being loaded, and may be anything.
+        if not isinstance(name, str):
+            return None
+        self._resolve(name)
+        processor = self._file_schemas.get(name, None)
+        if processor is None:
+            self._import_all()
+            processor = self._file_schemas.get(name, None)
+        return processor
+
     def load(self, targetpath):
+        # The document is parsed only once, using the loader registered for
+        # its extension. The schema declaration is read from the raw
+        # content, which is then handed to the target processor directly.
         baseparser = getattr(self, 'SchemaControlledYamlFile')
-        target = baseparser(targetpath)
-        target_schema = target.schema_name
-        if target_schema not in self._file_schemas.keys():
+        content = baseparser.read_document(targetpath)
+        policy = ConfigOptionPolicy(baseparser.path_context(targetpath),
+                                    ('schema', 'name'))
+        target_schema = policy.get(content)
+        target = self._get_file_schema(target_schema)
+        if target is None:
             # TODO Replace with a generic OptionPolicy?
             policy = ConfigOptionPolicy(self._validation_context,
                                         'schema.name',
                                         self._file_schemas.keys())
             raise SchemaNotSupportedError(policy, target_schema)
-        return getattr(self, target_schema)(targetpath)
+        if target._get_yaml_file is not \
+                SchemaControlledYamlFile._get_yaml_file or \
+                target.get_document_loader(targetpath) != \
+                baseparser.get_document_loader(targetpath):
+            # The target processor reads its files in a way of its own,
+            # or with a loader of its own, and the document is read again
+            # by the processor.
+            content = None
+        # Filesystem checks made while processing the file share directory
+        # listings. See tendril.schema.statcache.
+        with stat_cache.scope():
+            return target(targetpath, content=content)
+
+    def load_many(self, targetpaths, workers=None, mode='thread',
+                  ordered=True):
+        """
+        Load many schema controlled files concurrently, using a pool of
+        ``workers`` threads (``mode='thread'``) or processes
+        (``mode='process'``).
+
+        Returns an iterator over a :class:`tendril.schema.batch.LoadResult`
+        for each file, in the order of ``targetpaths`` if ``ordered``, or
+        otherwise in the order in which they complete. Results produced by
+        worker processes are in their portable form.
+        """
+        return load_many(self, targetpaths, workers=workers, mode=mode,
+                         ordered=ordered)
+
+    @property
+    def async_loader(self):
+        if self._async_loader is None:
+            self._async_loader = AsyncSchemaLoader(self)
+        return self._async_loader
+
+    def aload(self, targetpath):
+        """
+        Coroutine which loads the schema controlled file at ``targetpath``
+        without blocking the event loop. See :mod:`tendril.schema.aio`.
+        """
+        return self.async_loader.load(targetpath)
+
+    def aload_many(self, targetpaths):
+        """
+        Asynchronous iterator over a :class:`tendril.schema.batch.LoadResult`
+        for each of the given paths, in the order in which they complete.
+        """
+        return self.async_loader.load_many(targetpaths)
 
     def doc_render(self):
-        return self._docs
+        self._import_opaque()
+        return [(name, doc) for record in self._records
+                for name, _, doc in record.schemas]
 
     def __repr__(self):
         return "<SchemaManager>"
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Schema Registry Manifest (:mod:`tendril.schema.manifest`)
+=========================================================
+
+On-disk manifest of the schema modules of a namespace and the schemas
+they provide, used by the :class:`tendril.schema.manager.SchemaManager`
+to skip walking the namespace package and examining each module at
+startup.
+
+The manifest records the directories making up the namespace package
+and the modules found within them, along with the modification times
+of all of these. It is used only as long as none of these have changed,
+i.e., no schema module has been added, removed or modified. Otherwise,
+the namespace is scanned again and the manifest is rewritten.
+
+The manifest is written to ``$XDG_CACHE_HOME/tendril`` (by default,
+``~/.cache/tendril``), in a file named after the namespace and a hash of
+the directories making it up. The ``TENDRIL_SCHEMA_MANIFEST`` environment
+variable can be set to the path of the manifest file to use instead, or
+to an empty string to disable the manifest altogether.
+
+Running this module as a script reports the time taken to discover the
+schema modules with and without the manifest.
+
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+
+from tendril.utils.versions import get_namespace_package_names
+from tendril.schema.registry import SchemaModuleRecord
+from tendril.schema.registry import scan_schema_module
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+
+MANIFEST_VERSION = 1
+
+
+def default_manifest_path(prefix, path=None):
+    """
+    Return the default path of the manifest for the namespace package
+    ``prefix``, whose ``__path__`` is ``path``. The name of the file
+    includes a hash of ``path``, or of ``sys.prefix`` if it is not given,
+    so that different environments do not share a manifest.
+    """
+    manifest_path = os.environ.get('TENDRIL_SCHEMA_MANIFEST', None)
+    if manifest_path is not None:
+        return manifest_path or None
+    cache_dir = os.environ.get('XDG_CACHE_HOME', None) or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    key = os.pathsep.join(path) if path else sys.prefix
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, 'tendril',
+                        'schema-manifest-{0}-{1}.json'.format(prefix, digest))
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _fingerprint(path, records):
+    return {
+        'python': sys.version,
+        'path': list(path or []),
+        'dirs': [_mtime(x) for x in path or []],
+        'modules': [_mtime(x.origin) if x.origin else None
+                    for x in records],
+    }
+
+
+def scan_namespace(prefix, exclude=None):
+    rval = []
+    for m_name in get_namespace_package_names(prefix):
+        if m_name == exclude:
+            continue
+        rval.append(scan_schema_module(m_name))
+    return rval
+
+
+def read_manifest(manifest_path, prefix, path):
+    """
+    Return the module records held by the manifest at the given path, or
+    ``None`` if there is no valid manifest there.
+    """
+    try:
+        with open(manifest_path, 'r') as f:
+            content = json.load(f)
+        if content.get('version') != MANIFEST_VERSION or \
+                content.get('prefix') != prefix:
+            return None
+        records = []
+        for m in content['modules']:
+            record = SchemaModuleRecord(
+                m['name'], [tuple(x) for x in m['schemas']],
+                opaque=m['opaque'], origin=m['origin']
+            )
+            records.append(record)
+        fingerprint = content['fingerprint']
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        # Manifests which cannot be read are treated as stale.
+        logger.debug("Schema manifest {0} is unreadable"
+                     "".format(manifest_path))
+        return None
+    if fingerprint != _fingerprint(path, records):
+        logger.debug("Schema manifest {0} is stale".format(manifest_path))
+        return None
+    return records
+
+
+def write_manifest(manifest_path, prefix, path, records):
+    content = {
+        'version': MANIFEST_VERSION,
+        'prefix': prefix,
+        'fingerprint': _fingerprint(path, records),
+        'modules': [{
+            'name': x.name,
+            'origin': x.origin,
+            'opaque': x.opaque,
+            'schemas': x.schemas if not x.opaque else [],
+        } for x in records],
+    }
+    try:
+        dirpath = os.path.dirname(manifest_path) or '.'
+        if not os.path.exists(dirpath):
+            os.makedirs(dirpath)
+        fd, tmppath = tempfile.mkstemp(dir=dirpath, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(content, f, indent=1)
+        os.replace(tmppath, manifest_path)
+    except OSError as e:
+        logger.debug("Unable to write schema manifest {0} : {1}"
+                     "".format(manifest_path, e))
+
+
+def get_schema_modules(prefix, path, manifest_path=None, exclude=None):
+    """
+    Return the records of the schema modules of the namespace, from the
+    manifest at ``manifest_path`` if it is still valid. If it is not,
+    the namespace is scanned and the manifest is rebuilt.
+    """
+    if manifest_path:
+        records = read_manifest(manifest_path, prefix, path)
+        if records is not None:
+            return records
+    records = scan_namespace(prefix, exclude=exclude)
+    if manifest_path:
+        write_manifest(manifest_path, prefix, path, records)
+    return records
+
+
+def measure_startup(prefix='tendril.schema', repeat=5):
+    """
+    Measure the time taken to discover the schema modules of the
+    namespace, by scanning it and by reading a valid manifest. Times are
+    the best of ``repeat`` runs, in seconds.
+    """
+    from tendril.schema.manager import __name__ as exclude
+    package = sys.modules[prefix]
+    path = list(package.__path__)
+    fd, manifest_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        write_manifest(manifest_path, prefix, path,
+                       scan_namespace(prefix, exclude=exclude))
+
+        def _best(func):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        scan = _best(lambda: scan_namespace(prefix, exclude=exclude))
+        manifest = _best(lambda: read_manifest(manifest_path, prefix, path))
+    finally:
+        os.unlink(manifest_path)
+    return {
+        'modules': len(scan_namespace(prefix, exclude=exclude)),
+        'scan': scan,
+        'manifest': manifest,
+        'saved': scan - manifest,
+    }
+
+
+def load(manager):
+    pass
+
+
+if __name__ == '__main__':
+    result = measure_startup()
+    print("Schema modules          : {0}".format(result['modules']))
+    print("Namespace scan          : {0:.6f}s".format(result['scan']))
+    print("Manifest                : {0:.6f}s".format(result['manifest']))
+    print("Saved at startup        : {0:.6f}s".format(result['saved']))
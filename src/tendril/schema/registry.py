@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Schema Module Registry (:mod:`tendril.schema.registry`)
+=======================================================
+
+Infrastructure used by the :class:`tendril.schema.manager.SchemaManager`
+to find out which schemas are provided by which schema modules without
+importing them.
+
+Each schema module provides a ``load(manager)`` function, which installs
+its schemas using ``manager.load_schema(name, processor, doc=...)``. The
+source of the module is parsed and the ``load`` function is examined for
+these calls. Modules whose ``load`` function is simple enough, i.e. one
+which only makes ``load_schema`` calls with literal names and docs and
+perhaps logs something, are described completely by their
+:class:`SchemaModuleRecord`, and need only be imported when one of their
+schemas is actually used.
+
+Modules which do anything else in their ``load`` function are marked
+``opaque``, and the manager has to import them to find out what they
+provide.
+
+"""
+
+import ast
+import importlib.util
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+
+_passive_calls = ('debug', 'info', 'warning', 'format')
+
+
+class SchemaModuleRecord(object):
+    def __init__(self, name, schemas=None, opaque=False, origin=None):
+        self.name = name
+        # List of (schema name, processor name, doc)
+        self.schemas = schemas or []
+        self.opaque = opaque
+        self.origin = origin
+        self.loaded = False
+
+    @property
+    def schema_names(self):
+        return [x[0] for x in self.schemas]
+
+    def install(self, name, processor_name, doc):
+        for idx, (sname, _, _) in enumerate(self.schemas):
+            if sname == name:
+                self.schemas[idx] = (name, processor_name, doc)
+                return
+        self.schemas.append((name, processor_name, doc))
+
+    def __repr__(self):
+        return "<SchemaModuleRecord {0} [{1}]{2}>".format(
+            self.name, ','.join(self.schema_names),
+            ' opaque' if self.opaque else ''
+        )
+
+
+def _call_name(node):
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+
+
+def _dotted_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted_name(node.value)
+        if parent:
+            return '.'.join([parent, node.attr])
+
+
+def _load_schema_args(node):
+    args = dict(zip(('name', 'processor', 'doc'), node.args))
+    args.update({k.arg: k.value for k in node.keywords if k.arg})
+    if len(args) != len(node.args) + len(node.keywords):
+        raise ValueError
+    name = ast.literal_eval(args['name'])
+    doc = ast.literal_eval(args['doc'])
+    return name, _dotted_name(args['processor']), doc
+
+
+def _scan_load_function(fn):
+    schemas = []
+    for node in ast.walk(fn):
+        if isinstance(node, (ast.If, ast.For, ast.While, ast.Try,
+                             ast.With, ast.FunctionDef, ast.Lambda)) \
+                and node is not fn:
+            return None
+        if not isinstance(node, ast.Call):
+            continue
+        cname = _call_name(node)
+        if cname == 'load_schema':
+            try:
+                schemas.append(_load_schema_args(node))
+            except (ValueError, KeyError):
+                return None
+        elif cname not in _passive_calls:
+            return None
+    return schemas
+
+
+def scan_source(name, source, origin=None):
+    tree = ast.parse(source, origin or name)
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'load':
+            schemas = _scan_load_function(node)
+            if schemas is None:
+                break
+            return SchemaModuleRecord(name, schemas, origin=origin)
+    return SchemaModuleRecord(name, opaque=True, origin=origin)
+
+
+def scan_schema_module(name):
+    """
+    Examine the schema module with the given name without importing it,
+    and return a :class:`SchemaModuleRecord` describing it.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+        origin = spec.origin
+        if not origin or not origin.endswith('.py'):
+            raise ValueError
+        with open(origin, 'rb') as f:
+            source = f.read()
+        return scan_source(name, source, origin)
+    except Exception:
+        logger.debug("Unable to examine schema module {0}, marking opaque."
+                     "".format(name))
+        return SchemaModuleRecord(name, opaque=True)
+
+
+def load(manager):
+    pass
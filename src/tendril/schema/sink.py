@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Validation Error Sink (:mod:`tendril.schema.sink`)
+==================================================
+
+Bounded collection of the validation errors produced while validating
+many schema controlled files, for use in bulk runs.
+
+Outside of batch mode, every schema object with validation errors issues
+a warning when it is created. Within :func:`batch_mode`, no warnings are
+issued. Instead, each top-level object hands its validation errors, which
+include those of all its nested objects, to the active
+:class:`ErrorSink`.
+
+The sink keeps one error for each distinct combination of policy path,
+error type and value within a file, along with the number of times it
+occurred. At most ``max_per_file`` distinct errors are kept for each
+file, and any further errors are only counted. Errors are rendered only
+when :meth:`ErrorSink.report` is called.
+
+.. code-block:: python
+
+    with batch_mode() as sink:
+        for result in manager.load_many(paths):
+            ...
+    report = sink.report()
+
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class _SinkEntry(object):
+    __slots__ = ('error', 'count')
+
+    def __init__(self, error):
+        self.error = error
+        self.count = 1
+
+
+class _FileErrors(object):
+    __slots__ = ('entries', 'total', 'overflow')
+
+    def __init__(self):
+        self.entries = {}
+        self.total = 0
+        self.overflow = 0
+
+
+def _error_key(error):
+    policy = getattr(error, 'policy', None)
+    path = getattr(policy, 'path', None)
+    if isinstance(path, tuple):
+        path = '/'.join(str(x) for x in path)
+    value = getattr(error, '_value', None)
+    try:
+        hash(value)
+    except TypeError:
+        value = repr(value)
+    return path, error.__class__.__name__, value
+
+
+class ErrorSink(object):
+    def __init__(self, max_per_file=50):
+        self.max_per_file = max_per_file
+        self._lock = threading.Lock()
+        self._files = {}
+
+    def add(self, source, errors):
+        """
+        Add the given validation errors, produced while processing
+        ``source``, typically the path of a file.
+        """
+        keys = [(_error_key(x), x) for x in errors]
+        if not keys:
+            return
+        with self._lock:
+            record = self._files.get(source, None)
+            if record is None:
+                record = self._files[source] = _FileErrors()
+            for key, error in keys:
+                record.total += 1
+                entry = record.entries.get(key, None)
+                if entry is not None:
+                    entry.count += 1
+                elif len(record.entries) < self.max_per_file:
+                    record.entries[key] = _SinkEntry(error)
+                else:
+                    record.overflow += 1
+
+    @property
+    def total(self):
+        return sum(x.total for x in self._files.values())
+
+    def __len__(self):
+        return len(self._files)
+
+    def clear(self):
+        with self._lock:
+            self._files = {}
+
+    @staticmethod
+    def _render(error):
+        try:
+            rval = dict(error.render())
+        except Exception:
+            rval = {'group': getattr(error, 'msg', None),
+                    'headline': repr(error), 'detail': None}
+        return rval
+
+    def report(self):
+        """
+        Render the collected errors, returning a dictionary of the
+        errors of each source, along with the overall counts.
+        """
+        with self._lock:
+            files = list(self._files.items())
+        rval = {'total': 0, 'distinct': 0, 'overflow': 0, 'files': {}}
+        for source, record in files:
+            errors = []
+            for (path, etype, value), entry in list(record.entries.items()):
+                rendered = self._render(entry.error)
+                rendered.update({'type': etype, 'path': path,
+                                 'count': entry.count})
+                errors.append(rendered)
+            rval['files'][source] = {
+                'total': record.total,
+                'overflow': record.overflow,
+                'errors': errors,
+            }
+            rval['total'] += record.total
+            rval['distinct'] += len(errors)
+            rval['overflow'] += record.overflow
+        return rval
+
+    def __repr__(self):
+        return "<ErrorSink {0} files {1} errors>".format(len(self), self.total)
+
+
+_sinks = []
+_sinks_lock = threading.Lock()
+_local = threading.local()
+
+
+def current_sink():
+    """
+    Return the sink of the innermost active :func:`batch_mode`, or
+    ``None`` if not in batch mode.
+    """
+    return _sinks[-1] if _sinks else None
+
+
+@contextmanager
+def batch_mode(sink=None, max_per_file=50):
+    """
+    Collect validation errors into ``sink``, or into a new
+    :class:`ErrorSink`, instead of issuing warnings. Batch mode applies
+    to all threads.
+    """
+    if sink is None:
+        sink = ErrorSink(max_per_file=max_per_file)
+    with _sinks_lock:
+        _sinks.append(sink)
+    try:
+        yield sink
+    finally:
+        with _sinks_lock:
+            _sinks.remove(sink)
+
+
+@contextmanager
+def nesting():
+    """
+    Track the processing of schema objects nested within one another in
+    the current thread. Yields whether this is the outermost object.
+    """
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    try:
+        yield not depth
+    finally:
+        _local.depth = depth
+
+
+def nesting_depth():
+    """
+    Return the number of schema objects being processed in the current
+    thread, each nested within the one before it.
+    """
+    return getattr(_local, 'depth', 0)
+
+
+@contextmanager
+def nested_at(depth):
+    """
+    Continue the nesting of schema objects of another thread in the
+    current thread, from the ``depth`` it was at in that thread. Used
+    for objects built on an executor on behalf of a collection, so that
+    their errors are not reported separately from those of the object
+    containing the collection.
+    """
+    previous = getattr(_local, 'depth', 0)
+    _local.depth = depth
+    try:
+        yield
+    finally:
+        _local.depth = previous
+
+
+def load(manager):
+    pass
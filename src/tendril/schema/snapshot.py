@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Snapshots of Processed Schema Objects (:mod:`tendril.schema.snapshot`)
+======================================================================
+
+Binary snapshot of processed schema controlled files, used to restore
+them when a process starts without reading, processing and validating
+the files again.
+
+Each file is held in the snapshot as a separately pickled entry, along
+with the fingerprint of the file (see
+:meth:`tendril.schema.cache.DocumentCache.fingerprint`) and of the module
+defining its processor class. An entry is only used while both of these
+are unchanged. Otherwise, the file is loaded again, and only that entry
+is replaced.
+
+Restored objects carry the attribute values and validation errors they
+had when the snapshot was taken. Checks made against other files during
+validation, such as the existence of the files of a
+:class:`tendril.schema.helpers.FileList`, are not made again. Objects
+which cannot be pickled are simply not held in the snapshot.
+
+Snapshots are pickles, and should only be read from trusted locations.
+
+.. code-block:: python
+
+    snapshot = SchemaSnapshot(manager, '/var/cache/app/schema.snapshot')
+    obj = snapshot.load('/path/to/file.yaml')
+    snapshot.save()
+
+"""
+
+import os
+import sys
+import pickle
+import tempfile
+import threading
+
+from tendril.schema.cache import document_cache
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+
+SNAPSHOT_VERSION = 1
+
+
+def _code_fingerprint(cls):
+    module = sys.modules.get(cls.__module__, None)
+    origin = getattr(module, '__file__', None)
+    try:
+        mtime = os.stat(origin).st_mtime_ns if origin else None
+    except OSError:
+        mtime = None
+    return cls.__module__, cls.__name__, mtime
+
+
+class _SnapshotEntry(object):
+    __slots__ = ('fingerprint', 'code', 'data')
+
+    def __init__(self, fingerprint, code, data):
+        self.fingerprint = fingerprint
+        self.code = code
+        self.data = data
+
+
+class SchemaSnapshot(object):
+    def __init__(self, manager, path):
+        self._manager = manager
+        self._path = path
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._dirty = False
+        self.restored = 0
+        self.rebuilt = 0
+        self._read()
+
+    @property
+    def path(self):
+        return self._path
+
+    def _read(self):
+        try:
+            with open(self._path, 'rb') as f:
+                content = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError,
+                AttributeError, ImportError, ValueError):
+            return
+        if not isinstance(content, dict) or \
+                content.get('version') != SNAPSHOT_VERSION or \
+                content.get('python') != sys.version:
+            return
+        self._entries = {k: _SnapshotEntry(*v)
+                         for k, v in content['entries'].items()}
+
+    def save(self):
+        """
+        Write the snapshot to disk, if it has changed since it was read
+        or last saved.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            content = {
+                'version': SNAPSHOT_VERSION,
+                'python': sys.version,
+                'entries': {k: (v.fingerprint, v.code, v.data)
+                            for k, v in self._entries.items()},
+            }
+            self._dirty = False
+        dirpath = os.path.dirname(self._path) or '.'
+        if not os.path.exists(dirpath):
+            os.makedirs(dirpath)
+        fd, tmppath = tempfile.mkstemp(dir=dirpath, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(content, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmppath, self._path)
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def _restore(self, key, fingerprint):
+        with self._lock:
+            entry = self._entries.get(key, None)
+        if entry is None or fingerprint is None or \
+                entry.fingerprint != fingerprint:
+            return None
+        try:
+            value = pickle.loads(entry.data)
+        except Exception as e:
+            logger.debug("Unable to restore {0} from snapshot : {1}"
+                         "".format(key, e))
+            return None
+        if entry.code != _code_fingerprint(value.__class__):
+            return None
+        return value
+
+    def _rebuild(self, key, path, fingerprint):
+        value = self._manager.load(path)
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug("Unable to snapshot {0} : {1}".format(key, e))
+            data = None
+        with self._lock:
+            if data is not None and fingerprint is not None:
+                self._entries[key] = _SnapshotEntry(
+                    fingerprint, _code_fingerprint(value.__class__), data
+                )
+            else:
+                self._entries.pop(key, None)
+            self._dirty = True
+            self.rebuilt += 1
+        return value
+
+    def load(self, path):
+        """
+        Return the processed object for the schema controlled file at the
+        given path, restored from the snapshot if its entry is still
+        valid, and otherwise loaded using the manager and added to the
+        snapshot.
+        """
+        key = self._key(path)
+        fingerprint = document_cache.fingerprint(path)
+        value = self._restore(key, fingerprint)
+        if value is not None:
+            with self._lock:
+                self.restored += 1
+            return value
+        return self._rebuild(key, path, fingerprint)
+
+    def stale(self):
+        """
+        Return the paths of the entries whose files have changed or have
+        been removed since they were added to the snapshot.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+        return [k for k, v in entries
+                if document_cache.fingerprint(k) != v.fingerprint]
+
+    def refresh(self):
+        """
+        Load again each file whose entry is stale, one at a time, dropping
+        the entries of files which no longer exist. Returns the paths of
+        the entries which were rebuilt or dropped.
+        """
+        rval = []
+        for key in self.stale():
+            fingerprint = document_cache.fingerprint(key)
+            if fingerprint is None:
+                with self._lock:
+                    self._entries.pop(key, None)
+                    self._dirty = True
+            else:
+                self._rebuild(key, key, fingerprint)
+            rval.append(key)
+        return rval
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries = {}
+            else:
+                self._entries.pop(self._key(path), None)
+            self._dirty = True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<SchemaSnapshot {0} {1} entries>".format(self._path, len(self))
+
+
+def load(manager):
+    pass
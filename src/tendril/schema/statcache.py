@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Filesystem Listing Cache (:mod:`tendril.schema.statcache`)
+==========================================================
+
+Short-lived cache of directory listings, used to check for the existence
+of the many files referred to by schema controlled files, such as those
+of a :class:`tendril.schema.helpers.FileList`, with a single
+:func:`os.scandir` call per directory instead of a ``stat`` call per file.
+
+Listings are only retained within a :meth:`StatCache.scope`, and for no
+longer than the ``ttl`` of the cache. The scope is held for the duration
+of each :meth:`tendril.schema.manager.SchemaManager.load`, so that the
+collections within the file being loaded share the listings. All the
+listings are discarded once the outermost scope is left. Listings can be
+discarded earlier using :meth:`StatCache.invalidate`.
+
+The cache only ever confirms that a file exists. Files which are not
+found in a listing, as well as symbolic links, are checked directly on
+the filesystem, so that missing files are reported exactly as before.
+
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+
+class StatCache(object):
+    def __init__(self, ttl=2.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._depth = 0
+        self.hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def scope(self):
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if not self._depth:
+                    self._listings.clear()
+
+    @property
+    def active(self):
+        return self._depth > 0
+
+    @staticmethod
+    def _scan(dirpath):
+        # Returns a dictionary of the names in the directory, with whether
+        # each is a symbolic link, or None if it could not be listed.
+        try:
+            with os.scandir(dirpath) as it:
+                return {x.name: x.is_symlink() for x in it}
+        except OSError:
+            return None
+
+    def listing(self, dirpath):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._listings.get(dirpath, None)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        names = self._scan(dirpath)
+        with self._lock:
+            if self._depth:
+                self._listings[dirpath] = (now, names)
+        return names
+
+    def prefetch(self, paths):
+        """
+        List the directories containing each of the given paths, if they
+        have not already been listed.
+        """
+        if not self.active:
+            return
+        for dirpath in set(os.path.dirname(x) for x in paths):
+            self.listing(dirpath)
+
+    def exists(self, path):
+        """
+        Return ``True`` if the path is known to exist from the listing of
+        its directory, or ``None`` if this could not be determined and the
+        filesystem has to be checked directly.
+        """
+        if not self.active:
+            return None
+        dirpath, name = os.path.split(path)
+        if name in ('', '.', '..'):
+            return None
+        names = self.listing(dirpath)
+        if names is None or names.get(name, True):
+            return None
+        return True
+
+    def invalidate(self, path=None):
+        """
+        Discard the listing of the given directory, and of the directory
+        containing the given path. If no path is given, all the listings
+        are discarded.
+        """
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+                return
+            self._listings.pop(path, None)
+            self._listings.pop(os.path.dirname(path), None)
+
+    def stats(self):
+        return {'listings': len(self._listings), 'ttl': self.ttl,
+                'hits': self.hits, 'misses': self.misses}
+
+    def __repr__(self):
+        return "<StatCache {0} listings>".format(len(self._listings))
+
+
+stat_cache = StatCache()
+
+
+def load(manager):
+    pass
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Streaming Schema Object Lists (:mod:`tendril.schema.stream`)
+============================================================
+
+Processing of very long sequences, such as parts lists and test logs,
+one item at a time. Unlike :class:`tendril.schema.helpers.SchemaObjectList`,
+a :class:`SchemaObjectStream` does not hold the source content or the
+processed items. Each item is parsed when it is reached during iteration,
+and is released once the consumer is done with it.
+
+Items can be drawn from any iterable, or directly from a sequence within
+a YAML file using :func:`iter_yaml_sequence`. In that case, each item is
+constructed only when it is reached, and files larger than the available
+memory can be processed.
+
+.. code-block:: python
+
+    class PartStream(SchemaObjectStream):
+        _objtype = Part
+
+    parts = PartStream.from_yaml('/path/to/parts.yaml', ('parts',))
+    for part in parts:
+        ...
+    parts.validation_errors
+
+"""
+
+import yaml
+from yaml.events import MappingStartEvent
+from yaml.events import SequenceStartEvent
+from yaml.events import SequenceEndEvent
+from yaml.events import CollectionStartEvent
+from yaml.events import CollectionEndEvent
+from yaml.events import ScalarEvent
+
+from tendril.validation.base import ErrorCollector
+from tendril.validation.base import ValidationContext
+from tendril.schema.helpers import SchemaObjectCollection
+
+
+def _skip_node(loader):
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, CollectionStartEvent):
+            depth += 1
+        elif isinstance(event, CollectionEndEvent):
+            depth -= 1
+        if not depth:
+            return
+
+
+def _find_sequence(loader, keys):
+    loader.get_event()
+    loader.get_event()
+    for key in keys:
+        if not loader.check_event(MappingStartEvent):
+            raise ValueError("Expected a mapping containing {0}".format(key))
+        loader.get_event()
+        while True:
+            if not loader.check_event(ScalarEvent):
+                raise ValueError("Key {0} not found".format(key))
+            event = loader.get_event()
+            if event.value == str(key):
+                break
+            _skip_node(loader)
+    if not loader.check_event(SequenceStartEvent):
+        raise ValueError("Expected a sequence at {0}".format('/'.join(keys)))
+    loader.get_event()
+
+
+def iter_yaml_sequence(path, keys=(), loader=yaml.Loader):
+    """
+    Iterate over the items of a sequence within the first document of a
+    YAML file, constructing each item only when it is reached.
+
+    The sequence is found by following ``keys`` through nested mappings
+    from the top of the document. The other content of the document is
+    skipped without being constructed. Anchors defined within skipped
+    content can therefore not be referred to by the items. Fragments in
+    ``<path>.d`` are not merged in, unlike when the whole file is read
+    with :func:`tendril.utils.files.yml.load`.
+    """
+    with open(path, 'r') as f:
+        stream = loader(f)
+        try:
+            _find_sequence(stream, tuple(keys))
+            while not stream.check_event(SequenceEndEvent):
+                node = stream.compose_node(None, None)
+                yield stream.construct_document(node)
+        finally:
+            stream.dispose()
+
+
+class SchemaObjectStream(SchemaObjectCollection):
+    """
+    Collection processing the items of its content one at a time, as it
+    is iterated over.
+
+    The content is an iterable of raw items, or a callable returning
+    one. If it is a callable, it is called for each iteration, so that
+    the stream can be iterated over more than once. Validation errors
+    are collected as the items are processed, and are those of the most
+    recent iteration. The stream supports neither
+    indexing nor ``len()``.
+    """
+    def __init__(self, content, *args, **kwargs):
+        super(SchemaObjectStream, self).__init__(content, *args, **kwargs)
+        self.count = 0
+
+    @classmethod
+    def from_yaml(cls, path, keys=(), *args, **kwargs):
+        """
+        Create a stream over the sequence at ``keys`` in the YAML file at
+        ``path``. See :func:`iter_yaml_sequence`.
+        """
+        if 'vctx' not in kwargs:
+            kwargs['vctx'] = ValidationContext(
+                path, locality='/'.join(str(x) for x in keys) or cls.__name__
+            )
+        return cls(lambda: iter_yaml_sequence(path, keys), *args, **kwargs)
+
+    @property
+    def _empty_container(self):
+        return None
+
+    @property
+    def content(self):
+        return iter(self)
+
+    def _iter_source(self):
+        if callable(self._source_content):
+            return iter(self._source_content())
+        return iter(self._source_content or ())
+
+    def __iter__(self):
+        # Each pass over the stream processes the items afresh, and its
+        # validation errors replace those of any earlier pass.
+        self.count = 0
+        self._validation_errors = ErrorCollector()
+        for item in self._iter_source():
+            if not self._validate_item(item):
+                continue
+            value = self._parse_item(item)
+            self.count += 1
+            yield value
+
+    def __bool__(self):
+        return True
+
+    def __len__(self):
+        raise TypeError("{0} does not support len()"
+                        "".format(self.__class__.__name__))
+
+    def __getitem__(self, item):
+        raise TypeError("{0} does not support indexing"
+                        "".format(self.__class__.__name__))
+
+    def __setitem__(self, key, value):
+        raise TypeError("{0} does not support indexing"
+                        "".format(self.__class__.__name__))
+
+    def __delitem__(self, key):
+        raise TypeError("{0} does not support indexing"
+                        "".format(self.__class__.__name__))
+
+    def __repr__(self):
+        return "<{0} {1} items processed>" \
+               "".format(self.__class__.__name__, self.count)
+
+
+def load(manager):
+    pass
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Live Registry of Schema Controlled Files (:mod:`tendril.schema.watch`)
+======================================================================
+
+Keeps a set of loaded schema controlled files up to date with the files
+on disk. Only the files which have changed are loaded again, so the work
+done on each change is proportional to the changes and not to the number
+of files being watched.
+
+Changes are detected by comparing the fingerprints of the files, as
+computed by :data:`tendril.schema.cache.document_cache`. This is done
+periodically, or, if the optional ``inotify_simple`` package is installed,
+when the kernel reports activity in the directories containing the
+watched files.
+
+The loaded objects are exposed through :meth:`SchemaWatcher.snapshot`,
+which returns a read-only mapping of paths to objects. A snapshot is never
+modified once it has been handed out. Every change produces a new
+snapshot instead, so readers always see a consistent set of objects.
+
+"""
+
+import os
+import threading
+from types import MappingProxyType
+
+from tendril.schema.batch import LoadResult
+from tendril.schema.cache import document_cache
+
+from tendril.utils import log
+logger = log.get_logger(__name__, log.DEFAULT)
+
+try:
+    from inotify_simple import INotify
+    from inotify_simple import flags as inotify_flags
+except ImportError:
+    INotify = None
+
+
+class SchemaWatcher(object):
+    def __init__(self, manager, paths=None, interval=1.0, use_inotify=None):
+        self._manager = manager
+        self._interval = interval
+        if use_inotify is None:
+            use_inotify = INotify is not None
+        self._use_inotify = use_inotify
+        self._lock = threading.RLock()
+        self._fingerprints = {}
+        self._snapshot = MappingProxyType({})
+        self._errors = MappingProxyType({})
+        self._callbacks = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._inotify = None
+        self._inotify_dirs = {}
+        for path in paths or []:
+            self.watch(path)
+
+    def on_change(self, callback):
+        """
+        Register a callback to be called as ``callback(path, old, result)``
+        whenever a watched file changes. ``old`` is the previously loaded
+        object, if any, and ``result`` is the
+        :class:`tendril.schema.batch.LoadResult` of loading the file again,
+        or ``None`` if the file has been removed.
+        """
+        self._callbacks.append(callback)
+        return callback
+
+    def snapshot(self):
+        return self._snapshot
+
+    def errors(self):
+        """
+        Return a read-only mapping of the paths of watched files which
+        could not be loaded to the errors raised while loading them.
+        """
+        return self._errors
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def watch(self, path):
+        key = self._key(path)
+        with self._lock:
+            if key in self._fingerprints:
+                return
+            self._fingerprints[key] = None
+            self._add_inotify_watch(key)
+        self._refresh([key])
+
+    def unwatch(self, path):
+        key = self._key(path)
+        with self._lock:
+            self._fingerprints.pop(key, None)
+            self._publish({key: None})
+
+    def _load(self, path):
+        # Files which cannot be loaded, including those caught half-way
+        # through being written, are reported through errors() until
+        # they change again.
+        return LoadResult.from_load(self._manager, path)
+
+    def _publish(self, results):
+        snapshot = dict(self._snapshot)
+        errors = dict(self._errors)
+        changes = []
+        for path, result in results.items():
+            old = snapshot.pop(path, None)
+            errors.pop(path, None)
+            if result is not None:
+                if result.ok:
+                    snapshot[path] = result.value
+                else:
+                    errors[path] = result.error
+            changes.append((path, old, result))
+        self._snapshot = MappingProxyType(snapshot)
+        self._errors = MappingProxyType(errors)
+        return changes
+
+    def _refresh(self, paths):
+        results = {}
+        for path in paths:
+            with self._lock:
+                if path not in self._fingerprints:
+                    continue
+                previous = self._fingerprints[path]
+            fingerprint = document_cache.fingerprint(path)
+            if fingerprint == previous:
+                continue
+            if fingerprint is None:
+                result = None
+            else:
+                result = self._load(path)
+            with self._lock:
+                if path not in self._fingerprints:
+                    continue
+                self._fingerprints[path] = fingerprint
+                results[path] = result
+                self._add_inotify_watch(path)
+        if not results:
+            return []
+        with self._lock:
+            changes = self._publish(results)
+        for path, old, result in changes:
+            logger.debug("Reloaded schema controlled file {0}".format(path))
+            for callback in self._callbacks:
+                try:
+                    callback(path, old, result)
+                except Exception as e:
+                    logger.warning("Change callback for {0} failed : {1}"
+                                   "".format(path, e))
+        return [x[0] for x in changes]
+
+    def poll(self):
+        """
+        Check all the watched files, load those which have changed, and
+        return the list of paths which changed.
+        """
+        with self._lock:
+            paths = list(self._fingerprints.keys())
+        return self._refresh(paths)
+
+    def _add_inotify_watch(self, key):
+        if self._inotify is None:
+            return
+        mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | \
+            inotify_flags.MOVED_FROM | inotify_flags.CREATE | \
+            inotify_flags.DELETE
+        for dirpath in (os.path.dirname(key), key + '.d'):
+            if dirpath in self._inotify_dirs.values() or \
+                    not os.path.isdir(dirpath):
+                continue
+            wd = self._inotify.add_watch(dirpath, mask)
+            self._inotify_dirs[wd] = dirpath
+
+    def _affected(self, events):
+        dirs = set(self._inotify_dirs.get(e.wd) for e in events)
+        with self._lock:
+            return [x for x in self._fingerprints.keys()
+                    if os.path.dirname(x) in dirs or x + '.d' in dirs]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._inotify is not None:
+                    events = self._inotify.read(
+                        timeout=int(self._interval * 1000)
+                    )
+                    if events:
+                        self._refresh(self._affected(events))
+                else:
+                    self._stop.wait(self._interval)
+                    self.poll()
+            except Exception as e:
+                logger.warning("Unable to refresh watched files : {0}"
+                               "".format(e))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self._use_inotify:
+            self._inotify = INotify()
+            with self._lock:
+                for key in self._fingerprints.keys():
+                    self._add_inotify_watch(key)
+        self.poll()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='SchemaWatcher')
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            self._inotify_dirs = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __repr__(self):
+        return "<SchemaWatcher {0} files>".format(len(self._fingerprints))
+
+
+def load(manager):
+    pass
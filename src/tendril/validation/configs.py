@@ -23,13 +23,91 @@ Validation elements for Schema Controlled Files
 """
 
 
+from copy import copy
+from decimal import Decimal
 from inspect import isclass
 from tendril.validation.base import ValidatableBase
 from tendril.validation.base import ValidationError
 from tendril.validation.base import ValidationPolicy
 
 
-class ContextualConfigError(ValidationError):
+_slot_names = {}
+_parser_chains = {}
+
+
+def _new_instance(cls):
+    return cls.__new__(cls)
+
+
+class CompactStateMixin(object):
+    """
+    Copying and pickling support for classes which keep their state in
+    ``__slots__``. Subclasses which do not declare ``__slots__`` keep any
+    attributes of their own in a ``__dict__`` as usual, and these are
+    included in the state as well.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def _state_slots(cls):
+        try:
+            return _slot_names[cls]
+        except KeyError:
+            names = []
+            for klass in reversed(cls.__mro__):
+                for name in klass.__dict__.get('__slots__', ()):
+                    if name not in ('__dict__', '__weakref__') and \
+                            name not in names:
+                        names.append(name)
+            _slot_names[cls] = names = tuple(names)
+            return names
+
+    def _get_state(self):
+        state = dict(getattr(self, '__dict__', None) or {})
+        for name in self._state_slots():
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def _set_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __getstate__(self):
+        return self._get_state()
+
+    def __setstate__(self, state):
+        self._set_state(state)
+
+    def __reduce__(self):
+        return _new_instance, (self.__class__,), self.__getstate__()
+
+
+class CompactPolicy(CompactStateMixin, ValidationPolicy):
+    """
+    Base for validation policies holding their state in ``__slots__``.
+    """
+    __slots__ = ('context', 'is_error')
+
+    def bind(self, context):
+        cls = self.__class__
+        rval = cls.__new__(cls)
+        for name in cls._state_slots():
+            try:
+                setattr(rval, name, getattr(self, name))
+            except AttributeError:
+                pass
+        state = getattr(self, '__dict__', None)
+        if state:
+            rval.__dict__.update(state)
+        rval.context = context
+        return rval
+
+
+class ContextualConfigError(CompactStateMixin, ValidationError):
+    __slots__ = ('_policy', 'detail')
     msg = "Incorrect Configuration"
 
     def __init__(self, policy):
@@ -51,6 +129,7 @@ class ContextualConfigError(ValidationError):
 
 
 class ConfigKeyError(ContextualConfigError):
+    __slots__ = ()
     msg = "Configuration Key Missing"
 
     def __init__(self, policy):
@@ -78,6 +157,7 @@ class ConfigKeyError(ContextualConfigError):
 
 
 class ConfigValueInvalidError(ContextualConfigError):
+    __slots__ = ('_value',)
     msg = "Configuration Value Unrecognized"
 
     def __init__(self, policy, value):
@@ -106,7 +186,11 @@ class ConfigValueInvalidError(ContextualConfigError):
         }
 
 
-class ConfigOptionPolicy(ValidationPolicy):
+class ConfigOptionPolicy(CompactPolicy):
+    __slots__ = ('path', 'parser', '_parser_args', 'options', 'default',
+                 'required', '_option_set', '_copy_default', '_accessor',
+                 '_accessor_key', '_parser_chain')
+
     def __init__(self, context, path, parser=None, parser_args=None,
                  required=True, options=None, default=None, is_error=True):
         super(ConfigOptionPolicy, self).__init__(context, is_error)
@@ -116,26 +200,122 @@ class ConfigOptionPolicy(ValidationPolicy):
         self.options = options
         self.default = default
         self.required = required
+        self._option_set = None
+        self._copy_default = False
+        self._accessor = None
+        self._accessor_key = None
+        self._parser_chain = None
 
     @property
     def parser_args(self):
         return self._parser_args or {}
 
-    def get(self, data):
+    def compile(self):
+        # Freeze the options into a hashed set for O(1) membership tests.
+        # This is only done for policies which are not going to change
+        # further, such as those held by a compiled schema policy plan.
+        # Since compiled policies are shared, mutable defaults are copied
+        # before they are handed out. The path and parsers are compiled
+        # into an accessor, which is used instead of interpreting them
+        # on every lookup.
+        self._copy_default = isinstance(self.default, (list, dict, set))
+        self._parser_chain = _compile_parsers(self.parser)
+        self._accessor = _compile_accessor(self, self._parser_chain)
+        self._accessor_key = None
+        if self.options is not None:
+            try:
+                self._option_set = frozenset(self.options)
+            except TypeError:
+                self._option_set = None
+
+    def _get_accessor(self):
+        # Policies which have not been compiled get an accessor when first
+        # used. Since such policies may still be modified, it is built
+        # again if any of the attributes it was built from are replaced.
+        accessor = self._accessor
+        key = self._accessor_key
+        if accessor is not None:
+            if key is None:
+                return accessor
+            path, parser, options = key
+            if path is self.path and parser is self.parser and \
+                    options is self.options:
+                return accessor
+        self._parser_chain = _compile_parsers(self.parser)
+        accessor = _compile_accessor(self, self._parser_chain)
+        self._accessor = accessor
+        self._accessor_key = (self.path, self.parser, self.options)
+        return accessor
+
+    def parser_stats(self):
+        """
+        Return the statistics of the compiled parsers of the policy, or
+        ``None`` if the policy has not been used yet or has no parsers.
+        Policies with the same parsers share their compiled parsers, and
+        so the statistics are those of all of them together.
+        """
+        if self._parser_chain is None:
+            return None
+        return self._parser_chain.stats()
+
+    def __getstate__(self):
+        # The compiled accessor and parsers cannot be pickled, and are
+        # compiled again when the policy is restored.
+        state = self._get_state()
+        state['_compiled'] = state.get('_accessor', None) is not None and \
+            state.get('_accessor_key', None) is None
+        state['_accessor'] = None
+        state['_accessor_key'] = None
+        state['_parser_chain'] = None
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        compiled = state.pop('_compiled', False)
+        self._set_state(state)
+        if compiled:
+            self.compile()
+
+    def check_option(self, value):
+        if self.options is None:
+            return True
+        if self._option_set is not None:
+            try:
+                return value in self._option_set
+            except TypeError:
+                pass
+        return value in self.options
+
+    def get(self, data, context=None):
+        # A context may be provided to evaluate a shared policy, such as
+        # one held by a compiled schema policy plan, on behalf of an
+        # instance without first binding the policy to its context.
         if self.path is None:
             return data
-        try:
-            return get_dict_val(data, self)
-        except ConfigKeyError as error:
-            if not self.required:
-                if self.default is None or not self.parser:
-                    return self.default
-                if isclass(self.parser) and isinstance(self.default, self.parser):
-                    return self.default
-                vctx = self.context.child(self.parser.__name__)
-                return _parse(self.parser, self.default, vctx=vctx, **self.parser_args)
-            else:
-                raise error
+        # Missing keys are signalled by the accessor with a sentinel, so
+        # that no exception is built for optional keys which are absent.
+        accessor = self._accessor
+        if accessor is None or self._accessor_key is not None:
+            accessor = self._get_accessor()
+        rval = accessor(data, self, context)
+        if rval is not _MISSING:
+            return rval
+        if self.required:
+            raise ConfigKeyError(policy=_bound(self, context))
+        return self._get_default(context)
+
+    def _get_default(self, context=None):
+        if self.default is None or not self.parser:
+            if self._copy_default:
+                return copy(self.default)
+            return self.default
+        if isclass(self.parser) and isinstance(self.default, self.parser):
+            return self.default
+        parser = self.parser
+        if isclass(parser) and issubclass(parser, ValidatableBase):
+            vctx = (context or self.context).child(parser.__name__)
+            return parser(self.default, vctx=vctx, **self.parser_args)
+        return parser(self.default)
 
 
 def _parse(parser, value, vctx=None, **parser_args):
@@ -146,50 +326,208 @@ def _parse(parser, value, vctx=None, **parser_args):
         return parser(value)
 
 
-def get_dict_val(d, policy=None):
+def _bound(policy, context):
+    if context is None or context is policy.context:
+        return policy
+    return policy.bind(context)
+
+
+_MISSING = object()
+_dict_get = dict.get
+
+
+def _single_key(path):
+    # Returns the key of paths made of a single key, or _MISSING.
+    if not isinstance(path, tuple):
+        return path
+    if len(path) == 1:
+        return path[0]
+    return _MISSING
+
+
+# Parsers which are known to raise TypeError only for input types they do
+# not support, and never because of the particular value.
+_TYPE_STRICT_PARSERS = (int, float, complex, Decimal)
+
+
+class ParserChain(object):
+    """
+    The compiled parsers of a policy, tried in order until one of them
+    succeeds.
+
+    For each input type, the chain keeps the parsers which may succeed
+    for it. A parser may declare the types it accepts with an ``accepts``
+    attribute holding a tuple of types, in which case it is left out for
+    other types without being tried. Builtin numeric parsers which raise
+    a TypeError for an input type are dropped for that type from then on.
+    Failures which depend on the value, such as the ValueError raised by
+    ``int`` for ``'4.5'``, are not remembered, and the parser is tried
+    again for the next value. Since only parsers which cannot succeed are
+    skipped, the result is always that of the first parser in the
+    declared order to succeed.
+
+    Chains are shared by all policies with the same parsers, so that
+    what is learnt about an input type is kept across the instances of
+    a schema, and do not depend on the policy they are used for.
+    """
+    def __init__(self, parsers):
+        self.entries = tuple(
+            (p.__name__, p, isclass(p) and issubclass(p, ValidatableBase),
+             p in _TYPE_STRICT_PARSERS)
+            for p in parsers
+        )
+        self._by_type = {}
+        self.calls = 0
+        self.attempts = 0
+        self.failures = 0
+        self.pruned = 0
+
+    def candidates(self, vtype):
+        try:
+            return self._by_type[vtype]
+        except KeyError:
+            rval = tuple(
+                x for x in self.entries
+                if not isinstance(getattr(x[1], 'accepts', None), tuple) or
+                issubclass(vtype, x[1].accepts)
+            )
+            self._by_type[vtype] = rval
+            return rval
+
+    def prune(self, vtype, entry):
+        candidates = self.candidates(vtype)
+        if entry in candidates:
+            self._by_type[vtype] = tuple(x for x in candidates
+                                         if x is not entry)
+            self.pruned += 1
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'attempts': self.attempts,
+            'failures': self.failures,
+            'pruned': self.pruned,
+            'types': {
+                k.__name__: [x[0] for x in v]
+                for k, v in list(self._by_type.items())
+            },
+        }
+
+    def __repr__(self):
+        return "<ParserChain {0}>".format(
+            ', '.join(x[0] for x in self.entries))
+
+
+def _compile_parsers(parser):
+    if not parser:
+        return None
+    if not isinstance(parser, tuple):
+        parser = (parser,)
+    try:
+        return _parser_chains[parser]
+    except KeyError:
+        chain = ParserChain(parser)
+        _parser_chains[parser] = chain
+        return chain
+    except TypeError:
+        # Parsers which cannot be hashed get a chain of their own.
+        return ParserChain(parser)
+
+
+def _not_a_dict(d, policy, context):
     try:
         assert isinstance(d, dict)
     except AssertionError:
         print("Expected to get a dictionary here. This probably means the YAML "
               "file is empty or unrecognizably mangled. Got {0} instead.".format(d))
-        print(policy.context)
+        print(context or policy.context)
         raise
-    if isinstance(policy.path, tuple):
-        try:
-            for key in policy.path:
-                if key not in d.keys():
-                    raise KeyError
-                d = d.get(key)
-        except (KeyError, AttributeError):
-            raise ConfigKeyError(policy=policy)
-        rval = d
-    else:
-        try:
-            if policy.path not in d.keys():
-                raise KeyError
-            rval = d.get(policy.path)
-        except KeyError:
-            raise ConfigKeyError(policy=policy)
 
-    if policy.parser:
-        try:
-            if isinstance(policy.parser, tuple):
-                for parser in policy.parser:
-                    try:
-                        vctx = policy.context.child(parser.__name__)
-                        rval = _parse(parser, rval, vctx, **policy.parser_args)
-                        break
-                    except:
-                        continue
-                else:
-                    raise Exception
-            else:
-                vctx = policy.context.child(policy.parser.__name__)
-                rval = _parse(policy.parser, rval, vctx, **policy.parser_args)
-        except Exception as e:
-            raise ConfigValueInvalidError(policy=policy, value=rval)
 
-    if policy.options is None or rval in policy.options:
+def _compile_accessor(policy, chain=None):
+    """
+    Compile the path and the parsers of the policy into a function
+    equivalent to :func:`get_dict_val` for that policy, except that it
+    returns ``_MISSING`` instead of raising :class:`ConfigKeyError` if the
+    path is not found. The function does not depend on the context of the
+    policy, and can be shared by bound copies of it.
+    """
+    path = policy.path
+    key = _single_key(path)
+    if chain is None:
+        chain = _compile_parsers(policy.parser)
+    parser_args = policy.parser_args
+    check_options = policy.options is not None
+
+    if key is not _MISSING and chain is None and not check_options:
+        # Plain lookups of a single key are the most common by far, and
+        # reduce to a single dictionary lookup.
+        def accessor(d, policy, context):
+            try:
+                return _dict_get(d, key, _MISSING)
+            except TypeError:
+                _not_a_dict(d, policy, context)
+                raise
+        return accessor
+
+    def accessor(d, policy, context):
+        if key is not _MISSING:
+            try:
+                rval = _dict_get(d, key, _MISSING)
+            except TypeError:
+                _not_a_dict(d, policy, context)
+                raise
+            if rval is _MISSING:
+                return rval
+        else:
+            if not isinstance(d, dict):
+                _not_a_dict(d, policy, context)
+            rval = d
+            try:
+                for k in path:
+                    rval = rval.get(k, _MISSING)
+                    if rval is _MISSING:
+                        return rval
+            except AttributeError:
+                return _MISSING
+        if chain is not None:
+            pctx = context or policy.context
+            vtype = type(rval)
+            chain.calls += 1
+            for entry in chain.candidates(vtype):
+                name, parser, validatable, strict = entry
+                chain.attempts += 1
+                try:
+                    if validatable:
+                        rval = parser(rval, vctx=pctx.child(name),
+                                      **parser_args)
+                    else:
+                        rval = parser(rval)
+                    break
+                except TypeError:
+                    chain.failures += 1
+                    if strict:
+                        chain.prune(vtype, entry)
+                except Exception:
+                    chain.failures += 1
+            else:
+                raise ConfigValueInvalidError(policy=_bound(policy, context),
+                                              value=rval)
+        if check_options and not policy.check_option(rval):
+            raise ConfigValueInvalidError(policy=_bound(policy, context),
+                                          value=rval)
         return rval
-    else:
-        raise ConfigValueInvalidError(policy=policy, value=rval)
+    return accessor
+
+
+def get_dict_val(d, policy=None, context=None):
+    try:
+        accessor = policy._accessor
+        if accessor is None or policy._accessor_key is not None:
+            accessor = policy._get_accessor()
+    except AttributeError:
+        accessor = _compile_accessor(policy)
+    rval = accessor(d, policy, context)
+    if rval is _MISSING:
+        raise ConfigKeyError(policy=_bound(policy, context))
+    return rval
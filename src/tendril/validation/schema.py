@@ -23,11 +23,14 @@ Validation elements for Schema Declarations
 """
 
 
-from tendril.validation.base import ValidationPolicy
 from tendril.validation.base import ValidationError
+from tendril.validation.configs import CompactPolicy
+from tendril.validation.configs import CompactStateMixin
 
 
-class SchemaPolicy(ValidationPolicy):
+class SchemaPolicy(CompactPolicy):
+    __slots__ = ('name', 'vmax', 'vmin')
+
     def __init__(self, context, name, vmax, vmin):
         super(SchemaPolicy, self).__init__(context)
         self.name = name
@@ -44,7 +47,8 @@ class SchemaPolicy(ValidationPolicy):
         return "Supports {0}<={1}<={2}".format(self.vmin, self.name, self.vmax)
 
 
-class SchemaNotSupportedError(ValidationError):
+class SchemaNotSupportedError(CompactStateMixin, ValidationError):
+    __slots__ = ('_policy', 'detail', '_value')
     msg = "The file specifies a schema which is not supported."
 
     def __init__(self, policy, value):
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.schema.base`
+"""
+
+import os
+import warnings
+from decimal import Decimal
+
+from tendril.schema.base import SchemaControlledYamlFile
+from tendril.schema.helpers import FileList
+
+
+class FilesDoc(SchemaControlledYamlFile):
+    supports_schema_name = 'FilesDoc'
+    supports_schema_version_max = Decimal('1.0')
+    supports_schema_version_min = Decimal('1.0')
+
+    def elements(self):
+        e = super(FilesDoc, self).elements()
+        e.update({
+            'files': self._p('files', parser=FileList, parser_args={
+                'basedir': os.path.dirname(self.path)
+            }),
+        })
+        return e
+
+
+def _write_doc(dirpath, filename):
+    os.makedirs(str(dirpath))
+    (dirpath / filename).write_text('')
+    path = dirpath / 'doc.yaml'
+    path.write_text("schema:\n  name: FilesDoc\n  version: 1\n"
+                    "files:\n  - {0}\n".format(filename))
+    return str(path)
+
+
+def test_instance_dependent_policies_not_shared(tmp_path):
+    # Policies using values derived from the instance are rebuilt for
+    # each instance unless the class opts in to sharing them.
+    a = _write_doc(tmp_path / 'a', 'x.txt')
+    b = _write_doc(tmp_path / 'b', 'y.txt')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        doc_a = FilesDoc(a)
+        doc_b = FilesDoc(b)
+    assert doc_a.files.basedir == str(tmp_path / 'a')
+    assert doc_b.files.basedir == str(tmp_path / 'b')
+    for doc in (doc_a, doc_b):
+        assert not [x for x in doc.validation_errors.errors
+                    if x.__class__.__name__ == 'MissingFileError']
+
+
+def test_overriding_elements_does_not_inherit_plan():
+    assert SchemaControlledYamlFile._shares_policy_plan()
+    assert not FilesDoc._shares_policy_plan()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.schema.cache`
+"""
+
+import os
+
+from tendril.schema.cache import DocumentCache
+from tendril.schema.loaders import yaml_loader
+
+
+class CountingLoader(object):
+    def __init__(self, loader=yaml_loader):
+        self.loader = loader
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return self.loader(path)
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_cache_hits_are_isolated(tmp_path):
+    path = str(tmp_path / 'a.yaml')
+    _write(path, "items: [1, 2]\n")
+    cache = DocumentCache()
+    loader = CountingLoader()
+    first = cache.load(path, loader)
+    first['items'].append(3)
+    second = cache.load(path, loader)
+    assert second == {'items': [1, 2]}
+    second['items'].append(4)
+    assert cache.load(path, loader) == {'items': [1, 2]}
+    assert loader.calls == 1
+    assert cache.stats()['hits'] == 2
+
+
+def test_cache_unpicklable_trees_are_isolated(tmp_path):
+    # Instances of a class defined in a function cannot be pickled, and
+    # are held by the cache as deep copies instead.
+    class Local(object):
+        pass
+
+    path = str(tmp_path / 'a.yaml')
+    _write(path, "a: 1\n")
+    cache = DocumentCache()
+    loader = CountingLoader(lambda p: {'items': [Local()]})
+    first = cache.load(path, loader)
+    first['items'].append(1)
+    second = cache.load(path, loader)
+    assert len(second['items']) == 1
+    assert second['items'][0] is not first['items'][0]
+    assert loader.calls == 1
+
+
+def test_cache_eviction(tmp_path):
+    paths = [str(tmp_path / '{0}.yaml'.format(x)) for x in 'abc']
+    for path in paths:
+        _write(path, "a: 1\n")
+    cache = DocumentCache(max_entries=2)
+    loader = CountingLoader()
+    for path in paths:
+        cache.load(path, loader)
+    assert len(cache) == 2
+    assert cache.stats()['evictions'] == 1
+    cache.load(paths[2], loader)
+    assert loader.calls == 3
+    cache.load(paths[0], loader)
+    assert loader.calls == 4
+
+    cache = DocumentCache(max_bytes=1)
+    cache.load(paths[0], loader)
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+def test_cache_fingerprint_invalidation(tmp_path):
+    path = str(tmp_path / 'a.yaml')
+    _write(path, "a: 1\n")
+    cache = DocumentCache()
+    loader = CountingLoader()
+    assert cache.load(path, loader) == {'a': 1}
+    _write(path, "a: 22\n")
+    assert cache.load(path, loader) == {'a': 22}
+    os.mkdir(path + '.d')
+    _write(os.path.join(path + '.d', 'b.yaml'), "b: 2\n")
+    assert cache.load(path, loader) == {'a': 22, 'b': 2}
+    assert cache.load(path, loader) == {'a': 22, 'b': 2}
+    assert loader.calls == 3
+    cache.invalidate(path)
+    assert cache.load(path, loader) == {'a': 22, 'b': 2}
+    assert loader.calls == 4
+
+
+def test_cache_content_hash(tmp_path):
+    # Changes which keep the size and modification time of the file are
+    # only seen with the content hash.
+    path = str(tmp_path / 'a.yaml')
+    _write(path, "a: 1\n")
+    st = os.stat(path)
+    loader = CountingLoader()
+    plain = DocumentCache()
+    hashed = DocumentCache(use_hash=True)
+    for cache in (plain, hashed):
+        assert cache.load(path, loader) == {'a': 1}
+    _write(path, "a: 2\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert plain.load(path, loader) == {'a': 1}
+    assert hashed.load(path, loader) == {'a': 2}
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.validation.configs`
+"""
+
+from tendril.validation.base import ValidationContext
+from tendril.validation.configs import ConfigOptionPolicy
+from tendril.validation.configs import get_dict_val
+
+
+def _policy(path, parser, compiled=False):
+    policy = ConfigOptionPolicy(ValidationContext('test'), path, parser=parser)
+    if compiled:
+        policy.compile()
+    return policy
+
+
+def test_parser_stats_without_compiling():
+    policy = _policy('value', (int, float))
+    assert policy.parser_stats() is None
+    assert get_dict_val({'value': '4.5'}, policy) == 4.5
+    assert policy.parser_stats() is not None
+    assert policy.parser_stats()['types']['str'] == ['int', 'float']
+
+
+def test_parser_chains_shared():
+    parsers = (int, complex, str)
+    first = _policy('value', parsers)
+    second = _policy('value', parsers, compiled=True)
+    assert get_dict_val({'value': [1]}, first) == '[1]'
+    assert second.parser_stats() == first.parser_stats()
+    assert second.parser_stats()['types']['list'] == ['str']
+    calls = first.parser_stats()['calls']
+    assert get_dict_val({'value': [2]}, second) == '[2]'
+    assert first.parser_stats()['calls'] == calls + 1
+
+
+def test_parser_value_errors_not_pruned():
+    policy = _policy('value', (float, int))
+    for value in ('x', '1', 'y'):
+        try:
+            get_dict_val({'value': value}, policy)
+        except Exception:
+            pass
+    assert policy.parser_stats()['types']['str'] == ['float', 'int']
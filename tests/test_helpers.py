@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.schema.helpers`
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tendril.validation.base import ValidationError
+from tendril.validation.configs import ConfigValueInvalidError
+from tendril.schema.base import NakedSchemaObject
+from tendril.schema.helpers import DuplicateHandleError
+from tendril.schema.helpers import ScalarList
+from tendril.schema.helpers import SchemaObjectList
+
+
+class IntList(ScalarList):
+    _objtype = int
+    _typecode = 'i'
+
+
+class PlainIntList(IntList):
+    _use_numpy = False
+
+
+class FloatList(ScalarList):
+    pass
+
+
+class Part(object):
+    handle = 'name'
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "<Part {0}>".format(self.name)
+
+
+class PartList(SchemaObjectList):
+    _objtype = Part
+
+
+class UniquePartList(PartList):
+    _unique_handles = True
+
+
+def _errors(lst):
+    return [(x._index, x._value) for x in lst.validation_errors.errors]
+
+
+@pytest.mark.parametrize('cls', [IntList, PlainIntList])
+def test_scalar_list_rejects_out_of_range_integers(cls):
+    lst = cls([1, '99999999999', 2 ** 40, '3', None, 'x'])
+    assert list(lst) == [1, 3]
+    assert sorted(_errors(lst)) == [(1, '99999999999'), (2, 2 ** 40),
+                                    (5, 'x')]
+    # Without any other invalid items, the items are first converted
+    # together.
+    lst = cls([1, '99999999999', 2 ** 40, '3'])
+    assert list(lst) == [1, 3]
+    assert sorted(_errors(lst)) == [(1, '99999999999'), (2, 2 ** 40)]
+
+
+def test_scalar_list_floats():
+    lst = FloatList(['1.5', 2, 0, None, 'x', 3.25])
+    assert list(lst) == [1.5, 2.0, 0.0, 3.25]
+    assert _errors(lst) == [(4, 'x')]
+    lst[0] = '4'
+    lst.insert(0, 5)
+    del lst[-1]
+    assert list(lst) == [5.0, 4.0, 2.0, 0.0]
+
+
+def _check_handles(lst):
+    # The index of handles is kept up to date as the list is changed, and
+    # should agree with one built again from the items.
+    names = [x.name for x in lst]
+    assert list(lst.handles) == names
+    for name in names:
+        assert lst.get(name) is lst[names.index(name)]
+    lst._invalidate_handle_index()
+    assert list(lst.handles) == names
+
+
+def _parts(*names):
+    lst = PartList(list(names))
+    assert list(lst.handles) == list(names)
+    return lst
+
+
+@pytest.mark.parametrize('index', [0, 1, 3, 10, -1, -3, -10])
+def test_handles_insert(index):
+    lst = _parts('a', 'b', 'c')
+    lst.insert(index, Part('x'))
+    _check_handles(lst)
+
+
+@pytest.mark.parametrize('index', [0, 2, -1, -3])
+def test_handles_setitem_delitem(index):
+    lst = _parts('a', 'b', 'c')
+    lst[index] = Part('x')
+    _check_handles(lst)
+    del lst[index]
+    _check_handles(lst)
+    assert 'x' not in lst.handles
+
+
+@pytest.mark.parametrize('index', [3, 10, -4, -10])
+def test_handles_out_of_range(index):
+    lst = _parts('a', 'b', 'c')
+    with pytest.raises(IndexError):
+        lst[index] = Part('x')
+    with pytest.raises(IndexError):
+        del lst[index]
+    assert [x.name for x in lst] == ['a', 'b', 'c']
+    _check_handles(lst)
+
+
+def test_handles_duplicates():
+    lst = _parts('a', 'b', 'a')
+    first, second = lst[0], lst[2]
+    assert lst.get('a') is first
+    lst.insert(0, Part('a'))
+    assert lst.get('a') is lst[0]
+    del lst[0]
+    assert lst.get('a') is first
+    lst[0] = Part('c')
+    assert lst.get('a') is second
+    _check_handles(lst)
+    del lst[-1]
+    assert 'a' not in lst.handles
+    with pytest.raises(ValueError):
+        lst.get('a')
+
+
+def test_handles_slices():
+    lst = _parts('a', 'b', 'c', 'd')
+    lst[1:3] = [Part('x'), Part('y'), Part('z')]
+    _check_handles(lst)
+    del lst[::2]
+    assert list(lst.handles) == ['x', 'z']
+    _check_handles(lst)
+
+
+def test_unique_handles():
+    lst = UniquePartList(['a', 'b', 'a', 'b', 'c'])
+    errors = lst.validation_errors.errors
+    assert all(isinstance(x, DuplicateHandleError) for x in errors)
+    assert sorted(x._handle for x in errors) == ['a', 'b']
+    assert not UniquePartList(['a', 'b']).validation_errors.errors
+
+
+def _slow_int(value):
+    # Later items are parsed faster, so that they finish first when they
+    # are parsed concurrently.
+    try:
+        time.sleep((20 - int(value)) / 2000)
+    except ValueError:
+        pass
+    return int(value)
+
+
+class RejectedItem(ValidationError):
+    def __init__(self, item):
+        super(RejectedItem, self).__init__(None)
+        self._item = item
+
+
+def _reject(item):
+    if 'skip' in item:
+        raise RejectedItem(item)
+
+
+class Entry(NakedSchemaObject):
+    def elements(self):
+        e = super(Entry, self).elements()
+        e.update({'value': self._p('value', parser=_slow_int)})
+        return e
+
+
+class EntryList(SchemaObjectList):
+    _objtype = Entry
+    _validator = staticmethod(_reject)
+    _executor_chunksize = 1
+
+
+def _describe(lst):
+    rval = []
+    for e in lst.validation_errors.errors:
+        if isinstance(e, RejectedItem):
+            rval.append(('rejected', e._item['skip']))
+        else:
+            assert isinstance(e, ConfigValueInvalidError)
+            rval.append(('invalid', e._value))
+    return [vars(x).get('value', None) for x in lst], rval
+
+
+def test_executor_keeps_order():
+    items = [{'value': '0'}, {'value': 'bad1'}, {'value': '2'}, {'skip': 3},
+             {}, {'value': '5'}, {'value': 'bad6'}, {'value': '7'},
+             {'skip': 8}, {'value': '9'}, {'value': '10'}, {'value': 'bad11'},
+             {'skip': 12}, {'value': '13'}]
+    serial = _describe(EntryList(items))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concurrent = _describe(EntryList(items, executor=executor))
+    assert concurrent == serial
+    assert serial == (
+        [0, None, 2, 5, None, 7, 9, 10, None, 13],
+        [('invalid', 'bad1'), ('rejected', 3), ('invalid', 'bad6'),
+         ('rejected', 8), ('invalid', 'bad11'), ('rejected', 12)],
+    )
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.schema.index`
+"""
+
+from decimal import Decimal
+
+from tendril.schema.index import SchemaIndex
+
+
+def _write(path, version):
+    path.write_text("schema:\n  name: Widget\n  version: '{0}'\n"
+                    "".format(version))
+
+
+def test_fragments_belong_to_their_file(tmp_path):
+    _write(tmp_path / 'a.yaml', '1.0')
+    (tmp_path / 'a.yaml.d').mkdir()
+    _write(tmp_path / 'a.yaml.d' / 'extra.yaml', '1.1')
+    (tmp_path / 'b.d').mkdir()
+    _write(tmp_path / 'b.d' / 'c.yaml', '2.0')
+    index = SchemaIndex(str(tmp_path))
+    assert index.update() == (2, 0)
+    assert index.errors() == {}
+    assert index.find('Widget', vmin='1.1', vmax='1.1') == \
+        [str(tmp_path / 'a.yaml')]
+
+
+def test_fragment_changes_reexamine_file(tmp_path):
+    _write(tmp_path / 'a.yaml', '1.0')
+    (tmp_path / 'a.yaml.d').mkdir()
+    _write(tmp_path / 'a.yaml.d' / 'extra.yaml', '1.1')
+    index = SchemaIndex(str(tmp_path))
+    index.update()
+    index.save()
+    index = SchemaIndex(str(tmp_path))
+    assert index.update() == (0, 0)
+    _write(tmp_path / 'a.yaml.d' / 'extra.yaml', '1.25')
+    assert index.update() == (1, 0)
+    assert index.schemas() == {'Widget': [Decimal('1.25')]}
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.schema.manager`
+"""
+
+import os
+import sys
+import textwrap
+import subprocess
+
+import pytest
+
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), 'src')
+
+PLUGIN = '''
+from tendril.schema.base import SchemaControlledYamlFile
+
+
+class MyFile(SchemaControlledYamlFile):
+    supports_schema_name = 'MyFile'
+
+
+def load(manager):
+    manager.load_schema('MyFile', MyFile, doc="Plugin schema.")
+'''
+
+SCRIPT = '''
+import sys
+import tendril.schema
+assert 'MyFile' in tendril.schema.__all__
+assert tendril.schema.MyFile.__name__ == 'MyFile'
+assert 'tendril.schema.helpers' not in sys.modules
+import tendril.schema.helpers
+from tendril.schema.helpers import SchemaObjectList
+print('ok')
+'''
+
+
+def test_lazy_plugin_and_submodule_import(tmp_path):
+    # The manager replaces tendril.schema in sys.modules, so this is run
+    # in a fresh interpreter.
+    plugin_dir = tmp_path / 'tendril' / 'schema'
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / 'myplug.py').write_text(textwrap.dedent(PLUGIN))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [SRC, str(tmp_path)] + env.get('PYTHONPATH', '').split(os.pathsep)
+    )
+    env['TENDRIL_SCHEMA_MANIFEST'] = ''
+    result = subprocess.run([sys.executable, '-c', SCRIPT], env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith('ok')
+
+
+@pytest.mark.parametrize('name', ['12', '', '__class__', '_schemas',
+                                  '[a, b]', 'NoSuchSchema'])
+def test_unsupported_schema_names(tmp_path, name):
+    from tendril import schema
+    from tendril.validation.schema import SchemaNotSupportedError
+    path = tmp_path / 'doc.yaml'
+    path.write_text("schema:\n  name: {0}\n  version: 1\n".format(name))
+    with pytest.raises(SchemaNotSupportedError):
+        schema.load(str(path))
+
+
+def test_processor_reading_its_own_files(tmp_path):
+    # Processors which override _get_yaml_file read the document
+    # themselves, even when loaded through the manager.
+    from decimal import Decimal
+    from tendril import schema
+    from tendril.schema.base import SchemaControlledYamlFile
+
+    class Redirected(SchemaControlledYamlFile):
+        supports_schema_name = 'RedirectedTest'
+        supports_schema_version_max = Decimal('1.0')
+        supports_schema_version_min = Decimal('1.0')
+
+        def elements(self):
+            e = super(Redirected, self).elements()
+            e.update({'title': self._p('title')})
+            return e
+
+        def _get_yaml_file(self):
+            content = super(Redirected, self)._get_yaml_file()
+            content['title'] = content['title'].upper()
+            return content
+
+    schema.load_schema('RedirectedTest', Redirected, doc="Test schema.")
+    path = tmp_path / 'doc.yaml'
+    path.write_text("schema:\n  name: RedirectedTest\n  version: 1.0\n"
+                    "title: hello\n")
+    assert schema.load(str(path)).title == 'HELLO'
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+# Copyright (C) 2019 Chintalagiri Shashank
+#
+# This file is part of tendril.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for :mod:`tendril.schema.sink`
+"""
+
+import pytest
+
+from tendril.schema.base import NakedSchemaObject
+from tendril.schema.sink import batch_mode
+
+
+class Child(NakedSchemaObject):
+    def elements(self):
+        e = super(Child, self).elements()
+        e.update({'value': self._p('value', parser=int)})
+        return e
+
+
+class Parent(NakedSchemaObject):
+    def elements(self):
+        e = super(Parent, self).elements()
+        e.update({
+            'child': self._p('child', parser=Child),
+            'name': self._p('name'),
+        })
+        return e
+
+    @property
+    def ident(self):
+        return 'parent'
+
+
+CONTENT = {'name': 'p', 'child': {'value': 'not a number'}}
+
+
+def _total(lazy, access=()):
+    with batch_mode() as sink:
+        obj = Parent(CONTENT, lazy=lazy)
+        for item in access:
+            getattr(obj, item)
+        obj.materialize()
+    return sink.report()['total']
+
+
+@pytest.mark.parametrize('access', [(), ('child',), ('child', 'name')])
+def test_lazy_and_eager_totals_match(access):
+    assert _total(lazy=False) == 1
+    assert _total(lazy=True, access=access) == 1